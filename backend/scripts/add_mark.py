@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from all_things_ones.core import add_corner_mark
+from all_things_ones.core import add_corner_marks
 from all_things_ones.files import SaveType, load_image, save_image
 
 CIRCLE_SIZE = 250
@@ -17,16 +17,14 @@ def main():
         "output_image_3.png",
     ]
 
-    for i, file in enumerate(files):
-        img = load_image(folder / file)
-        marked_img = add_corner_mark(
-            img,
-            segment_index=i,
-            total_segments=len(files),
-            size=CIRCLE_SIZE,
-            margin=MARGIN,
-            opacity=OPACITY,
-        )
+    images = [load_image(folder / file) for file in files]
+    marked_images = add_corner_marks(
+        images,
+        size=CIRCLE_SIZE,
+        margin=MARGIN,
+        opacity=OPACITY,
+    )
+    for file, marked_img in zip(files, marked_images):
         output_path = file.replace("image_", "image_marked_")
         save_image(marked_img, output_path, image_type=SaveType.SPLIT)
 
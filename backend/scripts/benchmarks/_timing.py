@@ -0,0 +1,17 @@
+import time
+from typing import Any, Callable
+
+
+def time_call(fn: Callable, *args, repeats: int = 1, **kwargs) -> tuple[float, Any]:
+    """
+    Call fn repeats times.
+
+    Returns:
+        The fastest call in seconds, and the result of the last call
+    """
+    times = []
+    for _ in range(repeats):
+        start_time = time.perf_counter()
+        result = fn(*args, **kwargs)
+        times.append(time.perf_counter() - start_time)
+    return min(times), result
@@ -0,0 +1,37 @@
+import numpy as np
+from _timing import time_call
+
+from all_things_ones.logic.shatter import create_shatter_pattern
+
+image_size = 2000
+num_pieces_list = [15, 100, 500, 1000, 5000]
+methods = ["kdtree", "tiled"]
+
+
+def main():
+    print(f"{'pieces':>7} {'kdtree (s)':>11} {'tiled (s)':>10} {'speedup':>9}")
+    for num_pieces in num_pieces_list:
+        times = {}
+        patterns = {}
+        for method in methods:
+            times[method], patterns[method] = time_call(
+                create_shatter_pattern,
+                image_size,
+                image_size,
+                num_pieces,
+                seed=42,
+                method=method,
+            )
+        print(
+            f"{num_pieces:>7} {times['kdtree']:>11.3f} {times['tiled']:>10.3f} "
+            f"{times['kdtree'] / times['tiled']:>8.1f}x"
+        )
+
+        # Both methods must produce the same region map
+        assert np.array_equal(
+            patterns["kdtree"].region_map, patterns["tiled"].region_map
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,52 @@
+import numpy as np
+from _timing import time_call
+
+from all_things_ones.logic.shatter import (
+    DISTRIBUTION_STRATEGIES,
+    create_shatter_pattern,
+    distribute_pieces,
+    find_piece_adjacency,
+)
+
+image_size = 2000
+num_images = 4
+num_pieces_list = [15, 100, 500, 5000]
+
+
+def main():
+    print(
+        f"{'pieces':>7} {'strategy':>16} {'time (s)':>9} "
+        f"{'max/min pixels':>15} {'same-image neighbours':>22}"
+    )
+    for num_pieces in num_pieces_list:
+        pattern = create_shatter_pattern(
+            image_size, image_size, num_pieces, seed=42, method="tiled"
+        )
+        adjacency = find_piece_adjacency(pattern.region_map)
+        # Shared by every strategy, so keep it out of their timings
+        pattern.pixel_counts
+
+        for strategy in DISTRIBUTION_STRATEGIES:
+            elapsed, piece_to_image = time_call(
+                distribute_pieces, pattern, num_images, strategy, seed=42
+            )
+
+            assigned = piece_to_image >= 0
+            image_pixels = np.bincount(
+                piece_to_image[assigned],
+                weights=pattern.pixel_counts[assigned],
+                minlength=num_images,
+            )
+            pair_images = piece_to_image[adjacency]
+            conflicts = np.sum(
+                (pair_images[:, 0] == pair_images[:, 1]) & (pair_images[:, 0] >= 0)
+            )
+            print(
+                f"{num_pieces:>7} {strategy:>16} {elapsed:>9.3f} "
+                f"{image_pixels.max() / max(image_pixels.min(), 1):>15.2f} "
+                f"{conflicts:>10} / {len(adjacency):<9}"
+            )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+import cv2
+import numpy as np
+from _timing import time_call
+
+from all_things_ones.logic.conversion import save_image_to_bytes
+from all_things_ones.logic.pipeline.encode_stage import ENCODE_WORKERS, EncodeStage
+
+image_size = 2000
+num_layers = 4
+
+
+def compute_layer(seed: np.ndarray, sigma: float) -> np.ndarray:
+    # Stand-in for inpainting, a blur of the same order of cost per layer
+    colour = cv2.GaussianBlur(seed[:, :, :3], (0, 0), sigma)
+    return np.dstack([colour, seed[:, :, 3]])
+
+
+def encode_serial(seed: np.ndarray) -> list[bytes]:
+    return [save_image_to_bytes(compute_layer(seed, 4 + i)) for i in range(num_layers)]
+
+
+def encode_staged(seed: np.ndarray) -> list[bytes]:
+    encoder = EncodeStage()
+    encoded = []
+    for i in range(num_layers):
+        encoder.submit(save_image_to_bytes, compute_layer(seed, 4 + i))
+        encoded.extend(encoder.ready())
+    encoded.extend(encoder.drain())
+    return encoded
+
+
+def main():
+    rng = np.random.default_rng(0)
+    seed = rng.random((image_size, image_size, 4), dtype=np.float32)
+    seed[:, :, 3] = seed[:, :, 3] > 0.5
+
+    serial_time, expected = time_call(encode_serial, seed)
+    staged_time, result = time_call(encode_staged, seed)
+    assert result == expected
+
+    print(f"{'layers':>7} {'workers':>8} {'serial (s)':>11} {'staged (s)':>11}")
+    print(
+        f"{num_layers:>7} {ENCODE_WORKERS:>8} {serial_time:>11.2f} {staged_time:>11.2f}"
+    )
+
+
+if __name__ == "__main__":
+    main()
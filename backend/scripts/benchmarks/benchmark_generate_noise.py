@@ -0,0 +1,54 @@
+import numpy as np
+from _timing import time_call
+from scipy.ndimage import zoom
+
+from all_things_ones.logic.inpainting.generate_noise import generate_noise
+
+image_size = 2000
+
+
+def generate_perlin_noise(
+    height: int, width: int, scale: float = 100.0, octaves: int = 6
+) -> np.ndarray:
+    noise = np.zeros((height, width))
+
+    for octave in range(octaves):
+        freq = 2**octave
+        amp = 1.0 / (2**octave)
+
+        grid_h = int(height / scale * freq) + 2
+        grid_w = int(width / scale * freq) + 2
+        grid = np.random.randn(grid_h, grid_w)
+
+        zoomed = zoom(grid, (height / grid_h, width / grid_w), order=1)
+        noise += zoomed[:height, :width] * amp
+
+    noise = (noise - noise.min()) / (noise.max() - noise.min())
+    return noise
+
+
+def main():
+    np.random.seed(0)
+    print(f"{'scale':>6} {'octaves':>8} {'zoom (ms)':>10} {'tiled (ms)':>11}")
+    # The calls made by generate_organic_pattern and generate_fractal_pattern
+    for scale, octaves in [(150, 6), (300, 4), (20, 3), (200, 4), (25, 4)]:
+        old_time, expected = time_call(
+            generate_perlin_noise, image_size, image_size, scale, octaves
+        )
+        new_time, result = time_call(
+            generate_noise, image_size, image_size, scale, octaves, seed=0
+        )
+        assert result.dtype == np.float32 and result.shape == expected.shape
+        print(
+            f"{scale:>6} {octaves:>8} {old_time * 1000:>10.0f} {new_time * 1000:>11.0f}"
+        )
+
+    # Tiles only depend on the seed, not on how the image is split up
+    assert np.array_equal(
+        generate_noise(500, 700, seed=1, tile_size=64),
+        generate_noise(500, 700, seed=1, tile_size=1024),
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import contextlib
+import io
+import os
+
+import cv2
+import numpy as np
+from _timing import time_call
+
+from all_things_ones.logic.inpainting.generate_seeds_parallel import (
+    generate_seeds_parallel,
+    shutdown_inpaint_executors,
+)
+from all_things_ones.logic.inpainting.inpaint import generate_single_seed
+from all_things_ones.logic.segmentation import segment_into_layer_map
+
+image_size = 1000
+num_images = 5
+worker_counts = [2, 4]
+
+
+def create_layer_map():
+    rng = np.random.default_rng(0)
+    small = rng.random((32, 32, 3), dtype=np.float32)
+    target = cv2.resize(small, (image_size, image_size))
+    for layer_map in segment_into_layer_map(
+        target, num_images, image_size, search="bisection", coarse_scale=4
+    ):
+        pass
+    return layer_map
+
+
+def generate_seeds_serial(layer_map) -> list[np.ndarray]:
+    return [
+        generate_single_seed(layer_map.canvas(i), i, num_images)
+        for i in range(num_images - 1)
+    ]
+
+
+def main():
+    # The seeds print their progress, which would bury the table
+    with contextlib.redirect_stdout(io.StringIO()):
+        layer_map = create_layer_map()
+        serial_time, expected = time_call(generate_seeds_serial, layer_map)
+        rows = []
+        for workers in worker_counts:
+            # The first call also spawns the pool, later jobs reuse it
+            cold_time, _ = time_call(
+                list, generate_seeds_parallel(layer_map, num_images, workers)
+            )
+            warm_time, seeds = time_call(
+                list, generate_seeds_parallel(layer_map, num_images, workers)
+            )
+            assert all(np.array_equal(a, b) for a, b in zip(seeds, expected))
+            rows.append((workers, cold_time, warm_time))
+        shutdown_inpaint_executors()
+
+    print(f"{num_images - 1} seeds at {image_size}px on {os.cpu_count()} CPUs")
+    print(f"{'workers':>8} {'first job (s)':>14} {'later jobs (s)':>15} {'speedup':>8}")
+    print(f"{1:>8} {serial_time:>14.2f} {serial_time:>15.2f} {1:>8.2f}")
+    for workers, cold_time, warm_time in rows:
+        print(
+            f"{workers:>8} {cold_time:>14.2f} {warm_time:>15.2f} "
+            f"{serial_time / warm_time:>8.2f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,110 @@
+import numpy as np
+from _timing import time_call
+from scipy.ndimage import rotate
+
+from all_things_ones.logic.inpainting.inpaint import (
+    _window_sums,
+    generate_background_fill,
+    generate_texture_synthesis,
+)
+
+image_size = 2000
+patch_size = 50
+
+
+def generate_texture_synthesis_loop(
+    canvas: np.ndarray, patch_size: int, num_patches: int, rng: np.random.Generator
+) -> np.ndarray:
+    height, width = canvas.shape[:2]
+    pattern = np.zeros((height, width, 3), dtype=np.float32)
+    content_mask = canvas[:, :, 3] > 0
+
+    valid_patches = []
+    for y in range(0, height - patch_size, patch_size // 2):
+        for x in range(0, width - patch_size, patch_size // 2):
+            patch_mask = content_mask[y : y + patch_size, x : x + patch_size]
+            if np.sum(patch_mask) > (patch_size * patch_size * 0.1):
+                patch_rgb = canvas[y : y + patch_size, x : x + patch_size, :3].copy()
+                valid_patches.append((patch_rgb, patch_mask))
+
+    for _ in range(num_patches):
+        patch_rgb, patch_mask = valid_patches[rng.integers(len(valid_patches))]
+        y = int(rng.integers(0, height - patch_size))
+        x = int(rng.integers(0, width - patch_size))
+        if rng.random() > 0.5:
+            patch_rgb = np.fliplr(patch_rgb)
+            patch_mask = np.fliplr(patch_mask)
+        if rng.random() > 0.5:
+            patch_rgb = np.flipud(patch_rgb)
+            patch_mask = np.flipud(patch_mask)
+        angle = rng.choice([0, 90, 180, 270])
+        if angle > 0:
+            patch_rgb = rotate(patch_rgb, angle, reshape=False, axes=(0, 1), order=1)
+            patch_mask = (
+                rotate(patch_mask.astype(float), angle, reshape=False, order=0) > 0.5
+            )
+        color_shift = (rng.random(3) - 0.5) * 0.15
+        patch_rgb = np.clip(patch_rgb + color_shift, 0, 1)
+        alpha = 0.7
+        for c in range(3):
+            pattern[y : y + patch_size, x : x + patch_size, c] = np.where(
+                patch_mask,
+                patch_rgb[:, :, c] * alpha
+                + pattern[y : y + patch_size, x : x + patch_size, c] * (1 - alpha),
+                pattern[y : y + patch_size, x : x + patch_size, c],
+            )
+
+    empty_mask = np.all(pattern == 0, axis=2)
+    if np.any(empty_mask):
+        background = generate_background_fill(canvas, rng)
+        pattern[empty_mask] = background[empty_mask]
+    return pattern
+
+
+def create_canvas(rng: np.random.Generator) -> np.ndarray:
+    # Scattered rectangles of content, like the part of a layer left to mimic
+    canvas = np.zeros((image_size, image_size, 4), dtype=np.float32)
+    for _ in range(60):
+        y, x = rng.integers(0, image_size - 200, 2)
+        h, w = rng.integers(40, 200, 2)
+        canvas[y : y + h, x : x + w, :3] = rng.random(3)
+        canvas[y : y + h, x : x + w, 3] = 1
+    return canvas
+
+
+def main():
+    canvas = create_canvas(np.random.default_rng(0))
+
+    # The summed-area table finds the same windows as summing each one
+    content_mask = canvas[:, :, 3] > 0
+    grid = np.arange(0, image_size - patch_size, patch_size // 2)
+    expected = np.array(
+        [
+            [content_mask[y : y + patch_size, x : x + patch_size].sum() for x in grid]
+            for y in grid
+        ]
+    )
+    assert np.array_equal(_window_sums(content_mask, patch_size, grid, grid), expected)
+
+    print(f"{'patches':>8} {'loop (ms)':>10} {'vectorized (ms)':>16}")
+    for num_patches in [100, 250, 500, 1000, 2000]:
+        old_time, expected = time_call(
+            generate_texture_synthesis_loop,
+            canvas,
+            patch_size,
+            num_patches,
+            np.random.default_rng(1),
+        )
+        new_time, result = time_call(
+            generate_texture_synthesis,
+            canvas,
+            patch_size,
+            num_patches,
+            np.random.default_rng(1),
+        )
+        assert result.dtype == np.float32 and result.shape == expected.shape
+        print(f"{num_patches:>8} {old_time * 1000:>10.0f} {new_time * 1000:>16.0f}")
+
+
+if __name__ == "__main__":
+    main()
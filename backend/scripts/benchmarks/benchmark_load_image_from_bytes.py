@@ -0,0 +1,55 @@
+import io
+
+import cv2
+import numpy as np
+from _timing import time_call
+from PIL import Image
+
+from all_things_ones.logic.conversion import load_image_from_bytes
+from all_things_ones.logic.core import resize_image
+
+img_size = 2000
+
+
+def load_image_from_bytes_pil(image_bytes: bytes) -> np.ndarray:
+    image = Image.open(io.BytesIO(image_bytes))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    image_array = np.array(image).astype(np.float32) / 255.0
+    image_bgr = image_array[:, :, ::-1]
+    return resize_image(image_bgr, (img_size, img_size, 3))
+
+
+def create_photo(rng: np.random.Generator, width: int, height: int) -> bytes:
+    # Smooth colour with some grain, encoded like a phone camera would
+    small = rng.random((height // 16, width // 16, 3), dtype=np.float32)
+    image = cv2.resize(small, (width, height), interpolation=cv2.INTER_CUBIC)
+    image += rng.normal(0, 0.02, image.shape).astype(np.float32)
+    image_uint8 = (np.clip(image, 0, 1) * 255).astype(np.uint8)
+    success, buffer = cv2.imencode(".jpg", image_uint8, [cv2.IMWRITE_JPEG_QUALITY, 90])
+    assert success
+    return buffer.tobytes()
+
+
+def main():
+    rng = np.random.default_rng(0)
+    target_shape = (img_size, img_size, 3)
+    print(f"{'photo':>12} {'PIL (ms)':>9} {'cv2 (ms)':>9} {'mean diff':>10}")
+    for width, height in [(2000, 2000), (4000, 3000), (8000, 6000)]:
+        image_bytes = create_photo(rng, width, height)
+        old_time, expected = time_call(
+            load_image_from_bytes_pil, image_bytes, repeats=3
+        )
+        new_time, result = time_call(
+            load_image_from_bytes, image_bytes, target_shape, repeats=3
+        )
+        assert result.shape == expected.shape and result.dtype == np.float32
+        diff = np.abs(result - expected).mean()
+        print(
+            f"{f'{width}x{height}':>12} {old_time * 1000:>9.0f} "
+            f"{new_time * 1000:>9.0f} {diff:>10.4f}"
+        )
+
+
+if __name__ == "__main__":
+    main()
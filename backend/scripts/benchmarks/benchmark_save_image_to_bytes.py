@@ -0,0 +1,65 @@
+import io
+
+import cv2
+import numpy as np
+from _timing import time_call
+from PIL import Image
+
+from all_things_ones.logic.conversion import save_image_to_bytes
+from all_things_ones.logic.conversion.save_image_to_bytes import ENCODER_PRESETS
+
+image_size = 2000
+
+
+def save_image_to_bytes_pil(image: np.ndarray) -> bytes:
+    image_uint8 = (image * 255).astype(np.uint8)
+    image_rgba = cv2.cvtColor(image_uint8, cv2.COLOR_BGRA2RGBA)
+    pil_image = Image.fromarray(image_rgba, mode="RGBA")
+    buffer = io.BytesIO()
+    pil_image.save(buffer, format="PNG")
+    buffer.seek(0)
+    return buffer.getvalue()
+
+
+def create_layer(rng: np.random.Generator, noise: float) -> np.ndarray:
+    # Smooth colour with some grain, and large transparent regions like a layer
+    colour = cv2.GaussianBlur(
+        rng.random((image_size, image_size, 3), dtype=np.float32), (0, 0), 8
+    )
+    colour = (colour - colour.min()) / (colour.max() - colour.min())
+    colour += rng.random(colour.shape, dtype=np.float32) * noise
+    alpha = cv2.GaussianBlur(
+        rng.random((image_size, image_size), dtype=np.float32), (0, 0), 30
+    )
+    return np.dstack([np.clip(colour, 0, 1), alpha > 0.5]).astype(np.float32)
+
+
+def decode(data: bytes) -> np.ndarray:
+    return cv2.imdecode(np.frombuffer(data, np.uint8), cv2.IMREAD_UNCHANGED)
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(f"{'layer':>7} {'encoder':>16} {'time (ms)':>10} {'size (MB)':>10}")
+    for name, noise in [("smooth", 0.0), ("noisy", 0.05)]:
+        image = create_layer(rng, noise)
+        elapsed, reference = time_call(save_image_to_bytes_pil, image)
+        print(
+            f"{name:>7} {'PIL PNG':>16} {elapsed * 1000:>10.0f} {len(reference) / 1e6:>10.2f}"
+        )
+        expected = decode(reference)
+        visible = expected[:, :, 3] > 0
+
+        for format, presets in ENCODER_PRESETS.items():
+            for preset in presets:
+                elapsed, data = time_call(save_image_to_bytes, image, format, preset)
+                print(
+                    f"{name:>7} {format + ' ' + preset:>16} {elapsed * 1000:>10.0f} "
+                    f"{len(data) / 1e6:>10.2f}"
+                )
+                # Lossless: every visible pixel must decode to the old output
+                assert np.array_equal(decode(data)[visible], expected[visible])
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+import numpy as np
+from _timing import time_call
+
+from all_things_ones.logic.core import create_paired_image, trim_colour_to_fit
+
+sizes = [100, 200, 500, 2000]
+loop_max_size = 200
+
+
+def create_paired_image_loop(primary: np.ndarray, target: np.ndarray) -> np.ndarray:
+    height, width, channels = target.shape
+    secondary = np.zeros((height, width, channels), dtype=np.uint8)
+    for y in range(height):
+        for x in range(width):
+            for c in range(channels):
+                primary_value = primary[y, x, c]
+                target_value = target[y, x, c]
+                if primary_value == 0:
+                    secondary[y, x, c] = 0
+                else:
+                    secondary[y, x, c] = 255 * (target_value / primary_value)
+    return secondary
+
+
+def trim_colour_to_fit_loop(image: np.ndarray, target: np.ndarray) -> None:
+    height, width, channels = target.shape
+    for y in range(height):
+        for x in range(width):
+            for c in range(channels):
+                if image[y, x, c] < target[y, x, c]:
+                    image[y, x, c] = target[y, x, c]
+
+
+def main():
+    rng = np.random.default_rng(0)
+    print(
+        f"{'size':>6} {'function':>20} {'loop (s)':>10} {'array (s)':>10} {'speedup':>9}"
+    )
+    for size in sizes:
+        target = rng.random((size, size, 3), dtype=np.float32) * 0.7
+        primary = rng.random((size, size, 3), dtype=np.float32)
+        primary[rng.random(primary.shape) < 0.01] = 0
+
+        for name, loop_fn, array_fn in [
+            ("trim_colour_to_fit", trim_colour_to_fit_loop, trim_colour_to_fit),
+            ("create_paired_image", create_paired_image_loop, create_paired_image),
+        ]:
+            array_time, _ = time_call(array_fn, primary.copy(), target)
+            if size <= loop_max_size:
+                loop_time, _ = time_call(loop_fn, primary.copy(), target)
+            else:
+                # Too slow to run, extrapolate from the largest measured size
+                loop_time = (
+                    time_call(
+                        loop_fn,
+                        primary[:loop_max_size, :loop_max_size].copy(),
+                        target[:loop_max_size, :loop_max_size],
+                    )[0]
+                    * (size / loop_max_size) ** 2
+                )
+            print(
+                f"{size:>6} {name:>20} {loop_time:>10.3f} {array_time:>10.4f} "
+                f"{loop_time / array_time:>8.0f}x"
+            )
+
+        # Outputs must match the loop implementations exactly
+        small_primary = primary[:loop_max_size, :loop_max_size].copy()
+        small_target = target[:loop_max_size, :loop_max_size]
+        expected = small_primary.copy()
+        trim_colour_to_fit_loop(expected, small_target)
+        assert np.array_equal(trim_colour_to_fit(small_primary, small_target), expected)
+        assert np.array_equal(
+            create_paired_image(expected, small_target),
+            create_paired_image_loop(expected, small_target),
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,81 @@
+import asyncio
+import os
+from typing import Optional
+
+# Memory all running jobs together may use, on top of the server itself
+MEMORY_BUDGET_BYTES = int(os.environ.get("MEMORY_BUDGET_MB", "4096")) * 2**20
+# Jobs estimated to run longer than this are rejected outright
+MAX_JOB_SECONDS = float(os.environ.get("MAX_JOB_SECONDS", "600"))
+# How long a job waits for memory to free up before it is turned away
+ADMISSION_TIMEOUT_SECONDS = float(os.environ.get("ADMISSION_TIMEOUT_SECONDS", "60"))
+
+
+class AdmissionTimeoutError(Exception):
+    pass
+
+
+class MemoryBudget:
+    """
+    Node-wide memory budget that jobs reserve their estimated peak from.
+
+    Jobs that do not fit right now wait until running jobs release enough,
+    jobs larger than the whole budget should be rejected before reserving.
+    """
+
+    def __init__(self, budget_bytes: int = MEMORY_BUDGET_BYTES):
+        self.budget_bytes = budget_bytes
+        self._used = 0
+        self._condition = asyncio.Condition()
+        self._notify_tasks: set[asyncio.Task] = set()
+
+    def fits(self, memory_bytes: int) -> bool:
+        return memory_bytes <= self.budget_bytes
+
+    def available(self, memory_bytes: int) -> bool:
+        return self._used + memory_bytes <= self.budget_bytes
+
+    async def acquire(
+        self, memory_bytes: int, timeout: float = ADMISSION_TIMEOUT_SECONDS
+    ) -> None:
+        """
+        Take `memory_bytes` of the budget until it is given back with release.
+
+        Raises AdmissionTimeoutError if it does not become free within timeout.
+        """
+        async with self._condition:
+            try:
+                await asyncio.wait_for(
+                    self._condition.wait_for(lambda: self.available(memory_bytes)),
+                    timeout,
+                )
+            except asyncio.TimeoutError:
+                raise AdmissionTimeoutError(
+                    f"Server busy: no memory for this job after {timeout:.0f}s"
+                ) from None
+            self._used += memory_bytes
+
+    def release(self, memory_bytes: int) -> None:
+        """
+        Give back `memory_bytes` taken with acquire.
+
+        Must be called on the event loop thread, but need not be awaited so it
+        can run from a callback once the job is done.
+        """
+        self._used -= memory_bytes
+        task = asyncio.get_running_loop().create_task(self._notify_waiters())
+        self._notify_tasks.add(task)
+        task.add_done_callback(self._notify_tasks.discard)
+
+    async def _notify_waiters(self) -> None:
+        async with self._condition:
+            self._condition.notify_all()
+
+
+_memory_budget: Optional[MemoryBudget] = None
+
+
+def get_memory_budget() -> MemoryBudget:
+    global _memory_budget
+    if _memory_budget is None:
+        _memory_budget = MemoryBudget()
+    return _memory_budget
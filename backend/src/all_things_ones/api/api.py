@@ -1,9 +1,19 @@
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from .routes import health, process_image, root
+from .routes import health, jobs, process_image, root
+from .worker_pool import shutdown_worker_pool
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    shutdown_worker_pool()
+
 
-app = FastAPI(title="All Things Ones API", version="1.0.0")
+app = FastAPI(title="All Things Ones API", version="1.0.0", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -15,4 +25,5 @@ app.add_middleware(
 
 app.include_router(health.router, tags=["health"])
 app.include_router(process_image.router, tags=["processing"])
+app.include_router(jobs.router, tags=["processing"])
 app.include_router(root.router, tags=["root"])
@@ -0,0 +1,33 @@
+import asyncio
+
+from fastapi import APIRouter, HTTPException, Path, Request, Response
+
+from all_things_ones.repository.cache import get_layer_store
+
+router = APIRouter()
+
+MEDIA_TYPES = {"png": "image/png", "webp": "image/webp"}
+
+
+@router.get("/jobs/{job_id}/layers/{name}")
+async def get_job_layer(
+    request: Request,
+    job_id: str = Path(..., pattern=r"^[0-9a-f]{32}$"),
+    name: str = Path(..., pattern=r"^[a-z]+_\d+\.(png|webp)$"),
+):
+    # Layer files never change once written, so they can be cached for good
+    etag = f'"{job_id}-{name}"'
+    headers = {"Cache-Control": "public, max-age=31536000, immutable", "ETag": etag}
+    # An evicted or unknown layer is missing, not unmodified
+    store = get_layer_store()
+    if not await asyncio.to_thread(store.exists, job_id, name):
+        raise HTTPException(status_code=404, detail="Layer not found")
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=304, headers=headers)
+
+    data = await asyncio.to_thread(store.get, job_id, name)
+    if data is None:
+        # Evicted since the check above
+        raise HTTPException(status_code=404, detail="Layer not found")
+    media_type = MEDIA_TYPES[name.rsplit(".", 1)[1]]
+    return Response(content=data, media_type=media_type, headers=headers)
@@ -1,34 +1,79 @@
-import base64
-from typing import AsyncGenerator
+import asyncio
+import os
+from typing import AsyncGenerator, BinaryIO
 
-import numpy as np
-from fastapi import APIRouter, File, Form, UploadFile
+from fastapi import APIRouter, File, Form, HTTPException, UploadFile
 from fastapi.responses import StreamingResponse
+from PIL import Image
 
-from all_things_ones.logic.conversion import load_image_from_bytes, save_image_to_bytes
-from all_things_ones.logic.core import combine_layers_by_transparency, resize_image
-from all_things_ones.logic.events import (
-    create_complete_message,
-    create_error_message,
-    create_image_message,
-    create_status_message,
+from all_things_ones.api.admission import (
+    MAX_JOB_SECONDS,
+    AdmissionTimeoutError,
+    get_memory_budget,
+)
+from all_things_ones.api.worker_pool import WorkerPoolFullError, get_worker_pool
+from all_things_ones.logic.events import create_error_message, create_status_message
+from all_things_ones.logic.pipeline import (
+    estimate_pipeline_cost,
+    process_image_pipeline,
+    replay_cached_result,
+)
+from all_things_ones.repository.cache import (
+    get_layer_store,
+    get_result_cache,
+    get_result_cache_key,
 )
-from all_things_ones.logic.inpainting import inpaint
-from all_things_ones.logic.segmentation import segment_by_frequency
-from all_things_ones.repository.files import SaveType, save_image
 
 router = APIRouter()
 
+MAX_UPLOAD_BYTES = int(os.environ.get("MAX_UPLOAD_MB", "50")) * 2**20
+MAX_UPLOAD_PIXELS = int(float(os.environ.get("MAX_UPLOAD_MEGAPIXELS", "100")) * 1e6)
+MAX_IMG_SIZE = int(os.environ.get("MAX_IMG_SIZE", "8000"))
+MAX_NUM_IMAGES = int(os.environ.get("MAX_NUM_IMAGES", "16"))
+
 
 @router.post("/process-image")
 async def process_image(
     target_file: UploadFile = File(..., description="Target image to process"),
-    num_images: int = Form(4, description="Number of output images"),
-    img_size: int = Form(2000, description="Output image size (square)"),
+    num_images: int = Form(
+        4, ge=1, le=MAX_NUM_IMAGES, description="Number of output images"
+    ),
+    img_size: int = Form(
+        2000, ge=16, le=MAX_IMG_SIZE, description="Output image size (square)"
+    ),
 ):
+    # The upload is spooled to a temporary file while parsing, so it is only
+    # read into memory once it passed every check
+    upload_bytes = await asyncio.to_thread(_upload_size, target_file.file)
+    if upload_bytes > MAX_UPLOAD_BYTES:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload is larger than {MAX_UPLOAD_BYTES // 2**20}MB",
+        )
+    width, height = await asyncio.to_thread(_upload_dimensions, target_file.file)
+    if width * height > MAX_UPLOAD_PIXELS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload has more than {MAX_UPLOAD_PIXELS / 1e6:.0f} megapixels",
+        )
+
+    cost = estimate_pipeline_cost(width, height, upload_bytes, img_size, num_images)
+    if not get_memory_budget().fits(cost.memory_bytes):
+        raise HTTPException(
+            status_code=413,
+            detail=f"Job needs about {cost.memory_bytes // 2**20}MB, "
+            "more than this server allows",
+        )
+    if cost.seconds > MAX_JOB_SECONDS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Job would take about {cost.seconds:.0f}s, "
+            f"more than the {MAX_JOB_SECONDS:.0f}s this server allows",
+        )
+
     target_bytes = await target_file.read()
     return StreamingResponse(
-        process_with_sse(target_bytes, num_images, img_size),
+        process_with_sse(target_bytes, num_images, img_size, cost.memory_bytes),
         media_type="text/event-stream",
         headers={
             "Cache-Control": "no-cache",
@@ -42,47 +87,60 @@ async def process_with_sse(
     target_bytes: bytes,
     num_images: int,
     img_size: int,
+    memory_bytes: int,
 ) -> AsyncGenerator[str, None]:
-    try:
-        yield create_status_message("Loading image...")
-        target_img = load_image_from_bytes(target_bytes)
-        save_image(target_img, "target_img.png", image_type=SaveType.DEBUG)
-
-        target_img = resize_image(target_img, (img_size, img_size, 3))
-        save_image(target_img, "target_img_resized.png", image_type=SaveType.DEBUG)
-        yield create_status_message(f"Image loaded with shape {target_img.shape}")
+    cache_key = get_result_cache_key(target_bytes, num_images, img_size)
+    job_id = await asyncio.to_thread(get_layer_store().create_job)
+    cached_layers = await asyncio.to_thread(get_result_cache().get, cache_key)
+    if cached_layers is not None:
+        messages = await asyncio.to_thread(
+            list, replay_cached_result(cached_layers, job_id)
+        )
+        for message in messages:
+            yield message
+        return
 
-        yield create_status_message("Creating canvases")
-        canvases = [
-            np.zeros((img_size, img_size, 4), dtype=np.float32)
-            for _ in range(num_images)
-        ]
-
-        yield create_status_message("Segmenting image by frequency")
-
-        trans_images = []
-        for trans_img in segment_by_frequency(
-            target_img, canvases, num_images, img_size
+    budget = get_memory_budget()
+    if not budget.available(memory_bytes):
+        yield create_status_message("Waiting for server resources")
+    try:
+        await budget.acquire(memory_bytes)
+        # Held until the job is done rather than until this stream is closed,
+        # since the job keeps running after its client disconnects
+        async for message in get_worker_pool().stream(
+            process_image_pipeline,
+            target_bytes,
+            num_images,
+            img_size,
+            cache_key,
+            job_id,
+            on_done=lambda: budget.release(memory_bytes),
         ):
-            trans_images.append(trans_img)
-            index = len(trans_images) - 1
-            image_bytes = save_image_to_bytes(canvases[index], format="PNG")
-            img_base64 = base64.b64encode(image_bytes).decode("utf-8")
-            yield create_image_message(img_base64, index=index)
+            yield message
+    except (AdmissionTimeoutError, WorkerPoolFullError) as e:
+        yield create_error_message(str(e))
 
-        yield create_status_message("Inpainting images")
-        for i, layer in enumerate(
-            inpaint(canvases, trans_images, num_images, img_size)
-        ):
-            image_bytes = save_image_to_bytes(layer, format="PNG")
-            img_base64 = base64.b64encode(image_bytes).decode("utf-8")
-            yield create_image_message(img_base64, index=i)
 
-        combined = combine_layers_by_transparency(canvases)
-        save_image(combined, "combined_image.png", image_type=SaveType.DEBUG)
+def _upload_size(file: BinaryIO) -> int:
+    size = file.seek(0, os.SEEK_END)
+    file.seek(0)
+    return size
 
-        yield create_complete_message("Processing complete")
 
-    except Exception as e:
-        print(e)
-        yield create_error_message(str(e))
+def _upload_dimensions(file: BinaryIO) -> tuple[int, int]:
+    # Only the header is read
+    try:
+        with Image.open(file) as image:
+            size = image.size
+    except Image.DecompressionBombError:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Upload has more than {MAX_UPLOAD_PIXELS / 1e6:.0f} megapixels",
+        ) from None
+    except OSError:
+        raise HTTPException(
+            status_code=415, detail="Upload is not a supported image"
+        ) from None
+    finally:
+        file.seek(0)
+    return size
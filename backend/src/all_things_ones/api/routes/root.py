@@ -9,6 +9,7 @@ def read_root():
         "message": "All Things Ones API",
         "version": "1.0.0",
         "endpoints": {
-            "/process-image": "POST - Process an image through shattering pipeline"
+            "/process-image": "POST - Process an image through shattering pipeline",
+            "/jobs/{job_id}/layers/{name}": "GET - Download a layer produced by a job",
         },
     }
@@ -0,0 +1,149 @@
+import asyncio
+import multiprocessing
+import os
+import queue
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import AsyncGenerator, Callable, Iterator, Optional
+
+# "process" runs each job in a separate worker process so CPU-bound stages use
+# every core; "thread" keeps jobs in this process but still off the event loop.
+EXECUTION_MODE = os.environ.get("EXECUTION_MODE", "process")
+WORKER_COUNT = int(os.environ.get("WORKER_COUNT", os.cpu_count() or 1))
+WORKER_QUEUE_DEPTH = int(os.environ.get("WORKER_QUEUE_DEPTH", "4"))
+
+_JOB_DONE = None
+
+
+class WorkerPoolFullError(Exception):
+    pass
+
+
+class WorkerPool:
+    """
+    Bounded pool that runs synchronous message generators off the event loop.
+
+    At most `worker_count` jobs run at once and at most `queue_depth` more wait
+    for a free worker; anything beyond that is rejected.
+    """
+
+    def __init__(
+        self,
+        execution_mode: str = EXECUTION_MODE,
+        worker_count: int = WORKER_COUNT,
+        queue_depth: int = WORKER_QUEUE_DEPTH,
+    ):
+        if execution_mode not in ("process", "thread"):
+            raise ValueError(f"Unknown execution mode: {execution_mode}")
+        self.execution_mode = execution_mode
+        self.worker_count = max(1, worker_count)
+        self.queue_depth = max(0, queue_depth)
+        self._slots = threading.BoundedSemaphore(self.worker_count + self.queue_depth)
+        self._executor: Optional[Executor] = None
+        self._relay: Optional[ThreadPoolExecutor] = None
+        self._manager = None
+
+    def _get_executor(self) -> Executor:
+        if self._executor is None:
+            if self.execution_mode == "process":
+                context = multiprocessing.get_context("spawn")
+                self._manager = context.Manager()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.worker_count, mp_context=context
+                )
+            else:
+                self._executor = ThreadPoolExecutor(max_workers=self.worker_count)
+            # Every stream waits on its job's messages in a thread for as long
+            # as it holds a slot, so those get their own threads rather than
+            # starving the event loop's default executor
+            self._relay = ThreadPoolExecutor(
+                max_workers=self.worker_count + self.queue_depth,
+                thread_name_prefix="worker-pool-relay",
+            )
+        return self._executor
+
+    def _create_queue(self):
+        if self.execution_mode == "process":
+            return self._manager.Queue()
+        return queue.Queue()
+
+    async def stream(
+        self,
+        job: Callable[..., Iterator[str]],
+        *args,
+        on_done: Optional[Callable[[], None]] = None,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Run `job(*args)` in a worker and yield each message it produces.
+
+        `on_done` is called on the event loop once the job is done, or right
+        away if it never started, so resources held for it can be given back.
+
+        Raises WorkerPoolFullError if every worker and queue slot is taken.
+        """
+        if not self._slots.acquire(blocking=False):
+            if on_done is not None:
+                on_done()
+            raise WorkerPoolFullError(
+                f"Server busy: {self.worker_count} jobs running and "
+                f"{self.queue_depth} queued"
+            )
+        try:
+            executor = self._get_executor()
+            messages = self._create_queue()
+            future = executor.submit(_run_job, job, messages, *args)
+        except BaseException:
+            self._slots.release()
+            if on_done is not None:
+                on_done()
+            raise
+        # The slot is freed when the job itself is done, not when this stream
+        # is closed, since a job keeps running after its client disconnects
+        future.add_done_callback(lambda _: self._slots.release())
+        job_done = asyncio.wrap_future(future)
+        if on_done is not None:
+            job_done.add_done_callback(lambda _: on_done())
+
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await loop.run_in_executor(self._relay, messages.get)
+            if message is _JOB_DONE:
+                break
+            yield message
+        await job_done
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+        if self._relay is not None:
+            self._relay.shutdown(wait=False, cancel_futures=True)
+            self._relay = None
+        if self._manager is not None:
+            self._manager.shutdown()
+            self._manager = None
+
+
+def _run_job(job: Callable[..., Iterator[str]], messages, *args) -> None:
+    try:
+        for message in job(*args):
+            messages.put(message)
+    finally:
+        messages.put(_JOB_DONE)
+
+
+_worker_pool: Optional[WorkerPool] = None
+
+
+def get_worker_pool() -> WorkerPool:
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = WorkerPool()
+    return _worker_pool
+
+
+def shutdown_worker_pool() -> None:
+    global _worker_pool
+    if _worker_pool is not None:
+        _worker_pool.shutdown()
+        _worker_pool = None
@@ -1,19 +1,72 @@
 import io
+from typing import Optional
 
+import cv2
 import numpy as np
 from PIL import Image
 
+from all_things_ones.logic.core import resize_image
 
-def load_image_from_bytes(image_bytes: bytes) -> np.ndarray:
-    """Load image from bytes and convert to float32 numpy array"""
-    image = Image.open(io.BytesIO(image_bytes))
-    if image.mode != "RGB":
-        image = image.convert("RGB")
+# JPEG decode scales, largest first. libjpeg skips the detail it does not need
+# instead of decoding every pixel and throwing most of them away.
+REDUCED_DECODE_FLAGS = (
+    (8, cv2.IMREAD_REDUCED_COLOR_8),
+    (4, cv2.IMREAD_REDUCED_COLOR_4),
+    (2, cv2.IMREAD_REDUCED_COLOR_2),
+)
+
+
+def load_image_from_bytes(
+    image_bytes: bytes, target_shape: Optional[tuple[int, int, int]] = None
+) -> np.ndarray:
+    """
+    Decode an image to a contiguous float32 BGR array in [0, 1].
+
+    Args:
+        image_bytes: Encoded image
+        target_shape: Optional (height, width, channels) to resize to. Large
+            JPEGs are then decoded at a reduced scale, and the image is only
+            converted to float after resizing.
+
+    Returns:
+        Image of shape (height, width, 3)
+    """
+    flags = cv2.IMREAD_COLOR
+    if target_shape is not None:
+        flags = _decode_flags(image_bytes, target_shape)
+
+    image = cv2.imdecode(np.frombuffer(image_bytes, dtype=np.uint8), flags)
+    if image is None:
+        # Formats OpenCV was built without
+        image = _decode_with_pil(image_bytes)
 
-    # Convert to numpy array
-    image_array = np.array(image).astype(np.float32) / 255.0
+    if target_shape is not None and image.shape[:2] != tuple(target_shape[:2]):
+        image = resize_image(image, target_shape)
 
-    # Convert RGB to BGR for OpenCV compatibility
-    image_bgr = image_array[:, :, ::-1]
+    return np.divide(image, 255.0, dtype=np.float32)
 
-    return image_bgr
+
+def _decode_flags(image_bytes: bytes, target_shape: tuple[int, int, int]) -> int:
+    # Only the header is read here
+    try:
+        with Image.open(io.BytesIO(image_bytes)) as image:
+            if image.format != "JPEG":
+                return cv2.IMREAD_COLOR
+            width, height = image.size
+    except OSError:
+        return cv2.IMREAD_COLOR
+
+    # Keep both sides at least as large as the target whichever way the EXIF
+    # orientation turns the image
+    scale = min(width, height) / max(target_shape[:2])
+    for factor, flag in REDUCED_DECODE_FLAGS:
+        if scale >= factor:
+            return flag
+    return cv2.IMREAD_COLOR
+
+
+def _decode_with_pil(image_bytes: bytes) -> np.ndarray:
+    image = Image.open(io.BytesIO(image_bytes))
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return cv2.cvtColor(np.asarray(image), cv2.COLOR_RGB2BGR)
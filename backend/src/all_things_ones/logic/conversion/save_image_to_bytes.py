@@ -4,12 +4,84 @@ import cv2
 import numpy as np
 from PIL import Image
 
+# Encoder settings per format and preset, trading encode time for size.
+# On 2000px RGBA layers PNG fast/balanced/small take about 0.4/0.9/2.2s
+# (PIL's default took 2.5s), lossless WebP 0.25/1.2/1.8s at half the size.
+# See scripts/benchmarks/benchmark_save_image_to_bytes.py
+ENCODER_PRESETS = {
+    "PNG": {
+        "fast": [
+            cv2.IMWRITE_PNG_COMPRESSION,
+            1,
+            cv2.IMWRITE_PNG_STRATEGY,
+            cv2.IMWRITE_PNG_STRATEGY_RLE,
+        ],
+        "balanced": [
+            cv2.IMWRITE_PNG_COMPRESSION,
+            4,
+            cv2.IMWRITE_PNG_STRATEGY,
+            cv2.IMWRITE_PNG_STRATEGY_FILTERED,
+        ],
+        "small": [
+            cv2.IMWRITE_PNG_COMPRESSION,
+            6,
+            cv2.IMWRITE_PNG_STRATEGY,
+            cv2.IMWRITE_PNG_STRATEGY_FILTERED,
+        ],
+    },
+    "WEBP": {
+        "fast": {"lossless": True, "method": 0, "quality": 0},
+        "balanced": {"lossless": True, "method": 1, "quality": 25},
+        "small": {"lossless": True, "method": 4, "quality": 75},
+    },
+}
 
-def save_image_to_bytes(image: np.ndarray, format: str = "PNG") -> bytes:
-    image_uint8 = (image * 255).astype(np.uint8)
-    image_rgba = cv2.cvtColor(image_uint8, cv2.COLOR_BGRA2RGBA)
-    pil_image = Image.fromarray(image_rgba, mode="RGBA")
+
+def save_image_to_bytes(
+    image: np.ndarray, format: str = "PNG", preset: str = "balanced"
+) -> bytes:
+    """
+    Encode a float BGR(A) image in [0, 1] losslessly.
+
+    Args:
+        image: Image of shape (height, width, 3 or 4) in OpenCV channel order
+        format: "PNG" or "WEBP"
+        preset: "fast", "balanced" or "small", see ENCODER_PRESETS
+
+    Returns:
+        The encoded file contents
+    """
+    format = format.upper()
+    if format not in ENCODER_PRESETS:
+        raise ValueError(f"Unsupported image format: {format}")
+    if preset not in ENCODER_PRESETS[format]:
+        raise ValueError(f"Unknown encoder preset: {preset}")
+
+    if format == "PNG":
+        # OpenCV encodes BGR(A) directly, so no reordering is needed
+        image_uint8 = _quantize(image, reverse_colour=False)
+        success, buffer = cv2.imencode(
+            ".png", image_uint8, ENCODER_PRESETS[format][preset]
+        )
+        if not success:
+            raise ValueError("Failed to encode image as PNG")
+        return buffer.tobytes()
+
+    # PIL expects RGB(A), so the channels are swapped while quantizing
+    image_uint8 = _quantize(image, reverse_colour=True)
     buffer = io.BytesIO()
-    pil_image.save(buffer, format=format)
-    buffer.seek(0)
+    Image.fromarray(image_uint8).save(
+        buffer, format=format, **ENCODER_PRESETS[format][preset]
+    )
     return buffer.getvalue()
+
+
+def _quantize(image: np.ndarray, reverse_colour: bool) -> np.ndarray:
+    # Same truncation as (image * 255).astype(np.uint8), written straight into
+    # the output so there is no float temporary or separate reorder copy
+    image_uint8 = np.empty(image.shape, dtype=np.uint8)
+    colour_out = image_uint8[:, :, 2::-1] if reverse_colour else image_uint8[:, :, :3]
+    np.multiply(image[:, :, :3], 255, out=colour_out, casting="unsafe")
+    if image.shape[2] == 4:
+        np.multiply(image[:, :, 3], 255, out=image_uint8[:, :, 3], casting="unsafe")
+    return image_uint8
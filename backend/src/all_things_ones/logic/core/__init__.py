@@ -1,10 +1,11 @@
-from .add_corner_mark import add_corner_mark
+from .add_corner_mark import add_corner_mark, add_corner_marks
 from .adjust_image_brightness import adjust_image_brightness
 from .brighten_image import brighten_image
 from .combine_images import combine_images, combine_layers_by_transparency
 from .create_image import create_image
 from .create_paired_image import create_paired_image
 from .darken_image import darken_image, darken_image_pct
+from .gaussian_scale_space import GaussianScaleSpace
 from .low_pass_filter import low_pass_filter
 from .resize_image import resize_image
 from .split_image import split_image
@@ -12,6 +13,7 @@ from .trim_colour_to_fit import trim_colour_to_fit
 
 __all__ = [
     "add_corner_mark",
+    "add_corner_marks",
     "adjust_image_brightness",
     "brighten_image",
     "combine_images",
@@ -20,6 +22,7 @@ __all__ = [
     "create_paired_image",
     "darken_image",
     "darken_image_pct",
+    "GaussianScaleSpace",
     "low_pass_filter",
     "resize_image",
     "split_image",
@@ -1,4 +1,6 @@
 import math
+from functools import lru_cache
+from typing import Sequence
 
 import numpy as np
 
@@ -12,25 +14,94 @@ def add_corner_mark(
     opacity: float = 0.8,
     border_width: int = 1,
 ) -> np.ndarray:
-    marked_img = add_bottom_right_circle_mark(
-        image,
-        segment_index,
+    marked_img = image.copy()
+    _add_marks(
+        marked_img[None],
+        [segment_index],
         total_segments,
         size,
         margin,
         opacity,
         border_width,
     )
-    marked_img = add_top_left_square_mark(
-        marked_img,
-        segment_index,
+    return marked_img
+
+
+def add_corner_marks(
+    images: Sequence[np.ndarray],
+    total_segments: int = None,
+    size: int = 50,
+    margin: int = 5,
+    opacity: float = 0.8,
+    border_width: int = 1,
+) -> np.ndarray:
+    """
+    Mark a batch of same-shaped layers, layer i getting segment i.
+
+    The stamps for every layer are stacked so each corner is blended into
+    the whole batch with a single slice operation.
+
+    Args:
+        images: Layers to mark, as a list or an array of shape (n, height, width, ...)
+        total_segments: Number of segments in the mark, defaults to len(images)
+        size: Width of the circle and square marks in pixels
+        margin: Distance of the marks from the image edges
+        opacity: How strongly the marks cover the image
+        border_width: Width of the black outline
+
+    Returns:
+        Marked copy of the layers, shape (n, height, width, ...)
+    """
+    marked_images = np.array(images)
+    if total_segments is None:
+        total_segments = len(marked_images)
+    _add_marks(
+        marked_images,
+        range(len(marked_images)),
         total_segments,
         size,
         margin,
         opacity,
         border_width,
     )
-    return marked_img
+    return marked_images
+
+
+def _add_marks(
+    images: np.ndarray,
+    segment_indices: Sequence[int],
+    total_segments: int,
+    size: int,
+    margin: int,
+    opacity: float,
+    border_width: int,
+) -> None:
+    height, width = images.shape[1:3]
+    radius = size // 2
+
+    circle_stamps = [
+        _circle_stamp(size, i, total_segments, border_width) for i in segment_indices
+    ]
+    _blend_stamps(
+        images,
+        np.stack([colour for colour, _ in circle_stamps]),
+        np.stack([mask for _, mask in circle_stamps]),
+        width - radius - margin - radius,
+        height - radius - margin - radius,
+        opacity,
+    )
+
+    square_stamps = [
+        _square_stamp(size, i, total_segments, border_width) for i in segment_indices
+    ]
+    _blend_stamps(
+        images,
+        np.stack([colour for colour, _ in square_stamps]),
+        np.stack([mask for _, mask in square_stamps]),
+        margin,
+        margin,
+        opacity,
+    )
 
 
 def add_bottom_right_circle_mark(
@@ -45,56 +116,20 @@ def add_bottom_right_circle_mark(
     marked_image = image.copy()
 
     height, width = image.shape[:2]
-
-    # Calculate position (bottom right with margin)
-    center_x = width - circle_size // 2 - margin
-    center_y = height - circle_size // 2 - margin
-
-    # Calculate start and end angles for this segment
-    angle_per_segment = 2 * math.pi / total_segments
-    start_angle = segment_index * angle_per_segment
-    end_angle = (segment_index + 1) * angle_per_segment
-
-    # Create the segment mask
     radius = circle_size // 2
 
-    for y in range(max(0, center_y - radius), min(height, center_y + radius + 1)):
-        for x in range(max(0, center_x - radius), min(width, center_x + radius + 1)):
-            # Calculate distance from center
-            dx = x - center_x
-            dy = y - center_y
-            distance = math.sqrt(dx * dx + dy * dy)
-
-            # Check if point is within circle
-            if distance <= radius:
-                # Check if point is on the border
-                if distance > radius - border_width:
-                    # Black border
-                    color = np.array([0.0, 0.0, 0.0]) if len(image.shape) == 3 else 0.0
-                else:
-                    # Calculate angle from center
-                    angle = math.atan2(dy, dx)
-                    # Normalize angle to 0-2π
-                    if angle < 0:
-                        angle += 2 * math.pi
-
-                    # Check if angle is within this segment (black) or outside (white)
-                    if start_angle <= angle < end_angle:
-                        # Black segment
-                        color = (
-                            np.array([0.0, 0.0, 0.0]) if len(image.shape) == 3 else 0.0
-                        )
-                    else:
-                        # White rest of circle
-                        color = (
-                            np.array([1.0, 1.0, 1.0]) if len(image.shape) == 3 else 1.0
-                        )
-
-                # Blend with original image
-                marked_image[y, x] = (
-                    opacity * color + (1 - opacity) * marked_image[y, x]
-                )
-
+    # Stamp is the (2r + 1) square around the centre, bottom right with margin
+    colour, mask = _circle_stamp(
+        circle_size, segment_index, total_segments, border_width
+    )
+    _blend_stamps(
+        marked_image[None],
+        colour[None],
+        mask[None],
+        width - radius - margin - radius,
+        height - radius - margin - radius,
+        opacity,
+    )
     return marked_image
 
 
@@ -109,52 +144,124 @@ def add_top_left_square_mark(
 ) -> np.ndarray:
     marked_image = image.copy()
 
-    height, width = image.shape[:2]
+    colour, mask = _square_stamp(
+        square_size, segment_index, total_segments, border_width
+    )
+    _blend_stamps(marked_image[None], colour[None], mask[None], margin, margin, opacity)
+    return marked_image
+
+
+@lru_cache(maxsize=64)
+def _circle_stamp(
+    circle_size: int, segment_index: int, total_segments: int, border_width: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Rasterize the circle mark once per parameter set.
+
+    Returns:
+        (colour, mask): 0/1 colour of each stamp pixel and which pixels are
+        inside the circle, both of shape (2r + 1, 2r + 1). Read-only.
+    """
+    radius = circle_size // 2
+    offsets = np.arange(-radius, radius + 1)
+    dy, dx = np.meshgrid(offsets, offsets, indexing="ij")
+    distance = np.sqrt(dx * dx + dy * dy)
+
+    mask = distance <= radius
+    border = distance > radius - border_width
+    colour = _segment_colour(dy, dx, segment_index, total_segments)
+    colour[border] = 0.0
+    return _freeze(colour), _freeze(mask)
+
 
-    # Add square in top left corner
-    square_start_x = margin
-    square_start_y = margin
-    square_end_x = margin + square_size
-    square_end_y = margin + square_size
+@lru_cache(maxsize=64)
+def _square_stamp(
+    square_size: int, segment_index: int, total_segments: int, border_width: int
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Rasterize the square mark once per parameter set.
 
-    # Calculate center of square for angle calculations
-    center_x = square_start_x + square_size // 2
-    center_y = square_start_y + square_size // 2
+    Returns:
+        (colour, mask): 0/1 colour of each stamp pixel and which pixels are
+        covered (all of them), both of shape (size, size). Read-only.
+    """
+    centre = square_size // 2
+    offsets = np.arange(square_size)
+    y, x = np.meshgrid(offsets, offsets, indexing="ij")
 
-    # Calculate start and end angles for this segment
+    border = (
+        (x < border_width)
+        | (x >= square_size - border_width)
+        | (y < border_width)
+        | (y >= square_size - border_width)
+    )
+    colour = _segment_colour(y - centre, x - centre, segment_index, total_segments)
+    colour[border] = 0.0
+    return _freeze(colour), _freeze(np.ones_like(border))
+
+
+def _segment_colour(
+    dy: np.ndarray, dx: np.ndarray, segment_index: int, total_segments: int
+) -> np.ndarray:
+    # Black inside this segment's angle range, white elsewhere
     angle_per_segment = 2 * math.pi / total_segments
     start_angle = segment_index * angle_per_segment
     end_angle = (segment_index + 1) * angle_per_segment
 
-    for y in range(max(0, square_start_y), min(height, square_end_y)):
-        for x in range(max(0, square_start_x), min(width, square_end_x)):
-            # Check if point is on the border
-            if (
-                x < square_start_x + border_width
-                or x >= square_end_x - border_width
-                or y < square_start_y + border_width
-                or y >= square_end_y - border_width
-            ):
-                # Black border
-                color = np.array([0.0, 0.0, 0.0]) if len(image.shape) == 3 else 0.0
-            else:
-                # Calculate angle from center
-                dx = x - center_x
-                dy = y - center_y
-                angle = math.atan2(dy, dx)
-                # Normalize angle to 0-2π
-                if angle < 0:
-                    angle += 2 * math.pi
-
-                # Check if angle is within this segment (black) or outside (white)
-                if start_angle <= angle < end_angle:
-                    # Black segment
-                    color = np.array([0.0, 0.0, 0.0]) if len(image.shape) == 3 else 0.0
-                else:
-                    # White rest of square
-                    color = np.array([1.0, 1.0, 1.0]) if len(image.shape) == 3 else 1.0
-
-            # Blend with original image
-            marked_image[y, x] = opacity * color + (1 - opacity) * marked_image[y, x]
+    angle = np.arctan2(dy, dx)
+    angle[angle < 0] += 2 * math.pi
+    in_segment = (start_angle <= angle) & (angle < end_angle)
+    return np.where(in_segment, 0.0, 1.0)
 
-    return marked_image
+
+def _freeze(array: np.ndarray) -> np.ndarray:
+    # Stamps are shared through the cache, so guard against in-place edits
+    array.flags.writeable = False
+    return array
+
+
+def _blend_stamps(
+    images: np.ndarray,
+    colours: np.ndarray,
+    masks: np.ndarray,
+    start_x: int,
+    start_y: int,
+    opacity: float,
+) -> None:
+    """
+    Alpha-blend stamps into a batch of images in place.
+
+    Args:
+        images: Images of shape (n, height, width) or (n, height, width, channels)
+        colours: Stamp colours of shape (n, stamp_height, stamp_width)
+        masks: Which stamp pixels to blend, same shape as colours
+        start_x, start_y: Image position of the stamp's top left pixel, may
+            be off the image in which case the stamp is clipped
+        opacity: Weight of the stamp colour in the blend
+    """
+    height, width = images.shape[1:3]
+    stamp_height, stamp_width = colours.shape[1:3]
+
+    y0, x0 = max(0, start_y), max(0, start_x)
+    y1 = min(height, start_y + stamp_height)
+    x1 = min(width, start_x + stamp_width)
+    if y0 >= y1 or x0 >= x1:
+        return
+
+    stamp_slice = (
+        slice(None),
+        slice(y0 - start_y, y1 - start_y),
+        slice(x0 - start_x, x1 - start_x),
+    )
+    colour = colours[stamp_slice]
+    mask = masks[stamp_slice]
+    region = images[:, y0:y1, x0:x1]
+    if images.ndim == 4:
+        colour = colour[..., None]
+        mask = mask[..., None]
+    elif np.issubdtype(images.dtype, np.floating):
+        # Single channel colours were scalars, blended at the image's precision
+        colour = colour.astype(images.dtype)
+
+    blended = opacity * colour + (1 - opacity) * region
+    np.copyto(region, blended, casting="unsafe", where=mask)
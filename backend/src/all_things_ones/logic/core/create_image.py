@@ -1,5 +1,10 @@
+from typing import Optional
+
 import numpy as np
 
 
-def create_image(height: int, width: int) -> np.ndarray:
-    return np.random.randint(0, 256, (height, width, 3), dtype=np.uint8)
+def create_image(
+    height: int, width: int, rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
+    rng = np.random.default_rng(rng)
+    return rng.integers(0, 256, (height, width, 3), dtype=np.uint8)
@@ -1,16 +1,30 @@
 import numpy as np
 
 
-def create_paired_image(primary: np.ndarray, target: np.ndarray) -> np.ndarray:
-    height, width, channels = target.shape
-    secondary = np.zeros((height, width, channels), dtype=np.uint8)
-    for y in range(height):
-        for x in range(width):
-            for c in range(channels):
-                primary_value = primary[y, x, c]
-                target_value = target[y, x, c]
-                if primary_value == 0:
-                    secondary[y, x, c] = 0
-                else:
-                    secondary[y, x, c] = 255 * (target_value / primary_value)
-    return secondary
+def create_paired_image(
+    primary: np.ndarray, target: np.ndarray, out: np.ndarray = None
+) -> np.ndarray:
+    """
+    Create the image that, multiplied with primary, reproduces target.
+
+    Each value is 255 * target / primary, or 0 where primary is 0.
+
+    Args:
+        primary: Image the result will be paired with (float or uint8)
+        target: Image the pair should produce, same shape as primary
+        out: Optional uint8 array to write the result into
+
+    Returns:
+        uint8 image with the same shape as target
+    """
+    if out is None:
+        out = np.zeros(target.shape, dtype=np.uint8)
+    # The dtype np.divide would pick, zero wherever primary is 0
+    dtype = np.result_type(target, primary)
+    if not np.issubdtype(dtype, np.inexact):
+        dtype = np.float64
+    ratio = np.zeros(target.shape, dtype=dtype)
+    np.divide(target, primary, out=ratio, where=primary != 0)
+    ratio *= 255
+    np.copyto(out, ratio, casting="unsafe")
+    return out
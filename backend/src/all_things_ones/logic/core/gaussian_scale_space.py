@@ -0,0 +1,91 @@
+import math
+
+import cv2
+import numpy as np
+
+from .low_pass_filter import low_pass_filter
+
+
+class GaussianScaleSpace:
+    """
+    Produce Gaussian blurs of one image at many sigmas, reusing earlier work.
+
+    Two shortcuts are combined:
+        - Cascading: blur(s2) = blur(blur(s1), sqrt(s2^2 - s1^2)), so a larger
+          sigma only needs a small extra kernel on top of a cached result.
+        - Pyramid: large sigmas are computed on a downsampled copy of the
+          image (sigma scaled down to match) and upsampled at the end.
+
+    Args:
+        image: Input image as numpy array with shape (height, width, channels)
+        pyramid_min_sigma: Smallest sigma allowed at a downsampled level.
+            Higher values are more accurate but slower. 0 disables the pyramid.
+        max_cached: Number of blurred results kept per pyramid level
+    """
+
+    def __init__(
+        self,
+        image: np.ndarray,
+        pyramid_min_sigma: float = 8.0,
+        max_cached: int = 3,
+    ):
+        self.image = image
+        self.pyramid_min_sigma = pyramid_min_sigma
+        self.max_cached = max_cached
+        self._levels: dict[int, np.ndarray] = {1: image}
+        self._cache: dict[int, list[tuple[float, np.ndarray]]] = {}
+
+    def blur(self, sigma: float) -> np.ndarray:
+        if sigma <= 0:
+            return low_pass_filter(self.image, sigma=sigma)
+
+        factor = self._choose_factor(sigma)
+        blurred = self._blur_level(factor, sigma / factor)
+        if factor == 1:
+            return blurred
+
+        height, width = self.image.shape[:2]
+        return cv2.resize(blurred, (width, height), interpolation=cv2.INTER_LINEAR)
+
+    def _choose_factor(self, sigma: float) -> int:
+        if self.pyramid_min_sigma <= 0:
+            return 1
+        min_side = min(self.image.shape[:2])
+        factor = 1
+        while (
+            sigma / (factor * 2) >= self.pyramid_min_sigma
+            and min_side // (factor * 2) >= 16
+        ):
+            factor *= 2
+        return factor
+
+    def _get_level(self, factor: int) -> np.ndarray:
+        level = self._levels.get(factor)
+        if level is None:
+            height, width = self.image.shape[:2]
+            level = cv2.resize(
+                self.image,
+                (max(1, width // factor), max(1, height // factor)),
+                interpolation=cv2.INTER_AREA,
+            )
+            self._levels[factor] = level
+        return level
+
+    def _blur_level(self, factor: int, sigma: float) -> np.ndarray:
+        cached = self._cache.setdefault(factor, [])
+
+        # Start from the largest cached sigma that does not overshoot
+        start_sigma, start_img = 0.0, self._get_level(factor)
+        for cached_sigma, cached_img in cached:
+            if cached_sigma == sigma:
+                return cached_img
+            if start_sigma < cached_sigma < sigma:
+                start_sigma, start_img = cached_sigma, cached_img
+
+        increment = math.sqrt(sigma**2 - start_sigma**2)
+        blurred = low_pass_filter(start_img, sigma=increment)
+
+        cached.append((sigma, blurred))
+        if len(cached) > self.max_cached:
+            cached.pop(0)
+        return blurred
@@ -1,10 +1,25 @@
 import numpy as np
 
 
-def trim_colour_to_fit(image: np.ndarray, target: np.ndarray) -> np.ndarray:
-    height, width, channels = target.shape
-    for y in range(height):
-        for x in range(width):
-            for c in range(channels):
-                if image[y, x, c] < target[y, x, c]:
-                    image[y, x, c] = target[y, x, c]
+def trim_colour_to_fit(
+    image: np.ndarray, target: np.ndarray, out: np.ndarray = None
+) -> np.ndarray:
+    """
+    Raise every value of image that is below target up to target.
+
+    Works in place on image unless out is given.
+
+    Args:
+        image: Image to adjust (float or uint8)
+        target: Lower bound for each value, same shape as image
+        out: Optional array to write the result into instead of image
+
+    Returns:
+        The adjusted image (image itself, or out)
+    """
+    if out is None:
+        out = image
+    elif out is not image:
+        np.copyto(out, image, casting="unsafe")
+    np.copyto(out, target, casting="unsafe", where=image < target)
+    return out
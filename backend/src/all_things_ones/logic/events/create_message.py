@@ -15,10 +15,10 @@ def create_status_message(data: str) -> str:
     )
 
 
-def create_image_message(data: str, index: int) -> str:
+def create_image_message(url: str, index: int) -> str:
     timestamp = datetime.now(timezone.utc).isoformat()
     return create_sse_message(
-        EventType.IMAGE, {"image": data, "index": index, "timestamp": timestamp}
+        EventType.IMAGE, {"url": url, "index": index, "timestamp": timestamp}
     )
 
 
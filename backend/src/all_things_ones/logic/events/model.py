@@ -15,7 +15,7 @@ class MessageEventData(TypedDict):
 
 
 class ImageEventData(TypedDict):
-    image: str
+    url: str
     index: int
     timestamp: str
 
@@ -1,3 +1,3 @@
-from .inpaint import inpaint
+from .inpaint import inpaint, inpaint_layer_map
 
-__all__ = ["inpaint"]
+__all__ = ["inpaint", "inpaint_layer_map"]
@@ -0,0 +1,166 @@
+from concurrent.futures import Executor
+from typing import Optional, Union
+
+import numpy as np
+
+# Tiles of this size keep each octave's temporaries in cache, 512 measured
+# fastest on 2000px noise
+NOISE_TILE_SIZE = 512
+
+_MASK_64 = 2**64 - 1
+_ROW_MULTIPLIER = np.uint64(0x9E3779B97F4A7C15)
+_COL_MULTIPLIER = np.uint64(0xC2B2AE3D27D4EB4F)
+
+
+def generate_noise(
+    height: int,
+    width: int,
+    scale: float = 100.0,
+    octaves: int = 6,
+    seed: Union[int, np.random.Generator, None] = None,
+    tile_size: int = NOISE_TILE_SIZE,
+    executor: Optional[Executor] = None,
+) -> np.ndarray:
+    """
+    Generate 2D fractal value noise in [0, 1].
+
+    Each octave is a grid of Gaussian values, twice as fine and half as strong
+    as the one before, bilinearly interpolated over the image. Grid values are
+    hashed from (seed, octave, row, column) rather than drawn in sequence, so
+    tiles can be evaluated independently and in any order and still line up.
+
+    Args:
+        height, width: Size of the noise
+        scale: Spacing in pixels of the first octave's grid
+        octaves: Number of octaves summed
+        seed: Seed of the grid values, or a Generator to draw it from, a
+            fresh one if None
+        tile_size: Size of the square tiles the noise is evaluated in
+        executor: Optional executor to evaluate the tiles on in parallel
+
+    Returns:
+        float32 array of shape (height, width), normalized to [0, 1]
+    """
+    if not isinstance(seed, (int, np.integer)):
+        seed = int(np.random.default_rng(seed).integers(0, 2**31))
+
+    noise = np.empty((height, width), dtype=np.float32)
+
+    def fill_tile(origin: tuple[int, int]) -> None:
+        top, left = origin
+        bottom = min(top + tile_size, height)
+        right = min(left + tile_size, width)
+        noise[top:bottom, left:right] = generate_noise_tile(
+            height, width, scale, octaves, seed, top, left, bottom, right
+        )
+
+    origins = [
+        (top, left)
+        for top in range(0, height, tile_size)
+        for left in range(0, width, tile_size)
+    ]
+    if executor is None:
+        for origin in origins:
+            fill_tile(origin)
+    else:
+        list(executor.map(fill_tile, origins))
+
+    # Normalize over the whole image, not per tile, so tiles stay continuous
+    low, high = noise.min(), noise.max()
+    noise -= low
+    if high > low:
+        noise /= high - low
+    return noise
+
+
+def generate_noise_tile(
+    height: int,
+    width: int,
+    scale: float,
+    octaves: int,
+    seed: int,
+    top: int,
+    left: int,
+    bottom: int,
+    right: int,
+) -> np.ndarray:
+    """
+    Evaluate the unnormalized noise of a (height, width) image in one tile.
+
+    Returns:
+        float32 array of shape (bottom - top, right - left)
+    """
+    tile = np.zeros((bottom - top, right - left), dtype=np.float32)
+    for octave in range(octaves):
+        freq = 2**octave
+        amp = np.float32(1.0 / freq)
+
+        # Grid of the same size as the original scipy zoom based version, with
+        # its corners on the image corners
+        grid_h = int(height / scale * freq) + 2
+        grid_w = int(width / scale * freq) + 2
+        row_index, row_weight = _grid_coordinates(top, bottom, height, grid_h)
+        col_index, col_weight = _grid_coordinates(left, right, width, grid_w)
+
+        # Only the grid nodes this tile touches
+        row_start, col_start = row_index[0], col_index[0]
+        grid = _grid_values(
+            seed,
+            octave,
+            np.arange(row_start, row_index[-1] + 2, dtype=np.uint64),
+            np.arange(col_start, col_index[-1] + 2, dtype=np.uint64),
+        )
+        row_index -= row_start
+        col_index -= col_start
+
+        # Separable bilinear interpolation, columns first on the few grid rows
+        cols = grid[:, col_index] * (1 - col_weight)
+        cols += grid[:, col_index + 1] * col_weight
+        tile += (cols[row_index] * (amp * (1 - row_weight))[:, np.newaxis]) + (
+            cols[row_index + 1] * (amp * row_weight)[:, np.newaxis]
+        )
+    return tile
+
+
+def _grid_coordinates(
+    start: int, stop: int, size: int, grid_size: int
+) -> tuple[np.ndarray, np.ndarray]:
+    # Pixel i maps to grid coordinate i * (grid_size - 1) / (size - 1)
+    step = (grid_size - 1) / (size - 1) if size > 1 else 0.0
+    coordinates = np.arange(start, stop, dtype=np.float64) * step
+    index = np.minimum(coordinates.astype(np.int64), grid_size - 2)
+    weight = (coordinates - index).astype(np.float32)
+    return index, weight
+
+
+def _grid_values(
+    seed: int, octave: int, rows: np.ndarray, cols: np.ndarray
+) -> np.ndarray:
+    # Two independent uniforms per node, turned Gaussian with Box-Muller
+    first = _hash_uniform(_stream_key(seed, octave, 0), rows, cols)
+    second = _hash_uniform(_stream_key(seed, octave, 1), rows, cols)
+    radius = np.sqrt(-2.0 * np.log(first))
+    return (radius * np.cos(2 * np.pi * second)).astype(np.float32)
+
+
+def _stream_key(seed: int, octave: int, stream: int) -> np.uint64:
+    return np.uint64(_splitmix64((seed << 8) ^ (octave << 1) ^ stream))
+
+
+def _splitmix64(x: int) -> int:
+    x = (x + 0x9E3779B97F4A7C15) & _MASK_64
+    x = ((x ^ (x >> 30)) * 0xBF58476D1CE4E5B9) & _MASK_64
+    x = ((x ^ (x >> 27)) * 0x94D049BB133111EB) & _MASK_64
+    return x ^ (x >> 31)
+
+
+def _hash_uniform(key: np.uint64, rows: np.ndarray, cols: np.ndarray) -> np.ndarray:
+    # splitmix64 finalizer over (row, column) mixed with the key, as uniform
+    # floats in (0, 1]
+    x = (rows[:, np.newaxis] * _ROW_MULTIPLIER) ^ (cols * _COL_MULTIPLIER) ^ key
+    x ^= x >> np.uint64(30)
+    x *= np.uint64(0xBF58476D1CE4E5B9)
+    x ^= x >> np.uint64(27)
+    x *= np.uint64(0x94D049BB133111EB)
+    x ^= x >> np.uint64(31)
+    return ((x >> np.uint64(11)) + np.uint64(1)) * (1.0 / 2**53)
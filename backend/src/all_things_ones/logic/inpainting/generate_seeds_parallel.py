@@ -0,0 +1,192 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from contextlib import ExitStack, nullcontext
+from multiprocessing.shared_memory import SharedMemory
+from multiprocessing.util import Finalize
+from typing import Iterator, Optional
+
+import numpy as np
+
+from all_things_ones.logic.segmentation import LayerMap
+from all_things_ones.repository.files import (
+    current_debug_job,
+    debug_output,
+    flush_images,
+)
+
+# Processes generating seeds at once, 1 generates them in the pipeline itself
+INPAINT_WORKERS = int(os.environ.get("INPAINT_WORKERS", "1"))
+
+# (shared memory name, shape, dtype) of an array passed to a worker
+SharedArraySpec = tuple[str, tuple[int, ...], str]
+
+
+def generate_seeds_parallel(
+    layer_map: LayerMap,
+    num_images: int,
+    workers: int = INPAINT_WORKERS,
+    executor: Optional[Executor] = None,
+) -> Iterator[np.ndarray]:
+    """
+    Generate the seeds of every canvas but the last in worker processes.
+
+    Workers read the layer map from shared memory and build their canvas
+    themselves, and write their seed into one of 2 * workers shared slots, so
+    neither canvases nor seeds are pickled and at most that many seeds are held
+    at once. Each canvas draws from its own Generator seeded by its index, so
+    the seeds are the same as generate_single_seed run one after another.
+
+    Yields:
+        The seed of each canvas as float32 (height, width, 3), in index order
+    """
+    num_seeds = num_images - 1
+    if num_seeds <= 0:
+        return
+    executor = executor or get_inpaint_executor(workers)
+    height, width = layer_map.owner.shape
+    num_slots = min(num_seeds, 2 * max(1, workers))
+
+    with ExitStack() as stack:
+        target = stack.enter_context(_SharedArray.copy_of(layer_map.target))
+        owner = stack.enter_context(_SharedArray.copy_of(layer_map.owner))
+        seeds = stack.enter_context(
+            _SharedArray((num_slots, height, width, 3), np.float32)
+        )
+        debug_job = current_debug_job()
+
+        def submit(canvas_idx: int) -> Future:
+            return executor.submit(
+                _generate_seed_into,
+                target.spec,
+                owner.spec,
+                seeds.spec,
+                canvas_idx % num_slots,
+                canvas_idx,
+                num_images,
+                debug_job,
+            )
+
+        pending = [submit(canvas_idx) for canvas_idx in range(num_slots)]
+        try:
+            for canvas_idx in range(num_seeds):
+                pending[canvas_idx].result()
+                seed = seeds.array[canvas_idx % num_slots].copy()
+                # The slot is free again once its seed is copied out
+                if canvas_idx + num_slots < num_seeds:
+                    pending.append(submit(canvas_idx + num_slots))
+                yield seed
+        finally:
+            # Workers must be done with the shared memory before it is freed
+            for future in pending:
+                future.cancel()
+            for future in pending:
+                if not future.cancelled():
+                    future.exception()
+
+
+def _generate_seed_into(
+    target_spec: SharedArraySpec,
+    owner_spec: SharedArraySpec,
+    seeds_spec: SharedArraySpec,
+    slot: int,
+    canvas_idx: int,
+    num_images: int,
+    debug_job: Optional[tuple[str, bool]],
+) -> None:
+    # Imported here since inpaint imports this module
+    from .inpaint import generate_single_seed
+
+    with (
+        _SharedArray.attach(target_spec) as target,
+        _SharedArray.attach(owner_spec) as owner,
+        _SharedArray.attach(seeds_spec) as seeds,
+    ):
+        canvas = LayerMap(target.array, owner.array, num_images).canvas(canvas_idx)
+        debug = debug_output(*debug_job) if debug_job is not None else nullcontext()
+        with debug:
+            seeds.array[slot] = generate_single_seed(canvas, canvas_idx, num_images)
+    flush_images()
+
+
+class _SharedArray:
+    """
+    Array in a shared memory block, either created here or attached by spec.
+
+    Closing drops the array first, since the block cannot be closed while an
+    array still refers to it, and unlinks blocks created here.
+    """
+
+    def __init__(self, shape: tuple[int, ...], dtype, name: Optional[str] = None):
+        self._owned = name is None
+        size = max(1, int(np.prod(shape)) * np.dtype(dtype).itemsize)
+        self.memory = SharedMemory(name=name, create=self._owned, size=size)
+        self.array: Optional[np.ndarray] = np.ndarray(
+            shape, dtype=dtype, buffer=self.memory.buf
+        )
+        self.spec: SharedArraySpec = (
+            self.memory.name,
+            tuple(shape),
+            np.dtype(dtype).str,
+        )
+
+    @classmethod
+    def copy_of(cls, array: np.ndarray) -> "_SharedArray":
+        shared = cls(array.shape, array.dtype)
+        shared.array[...] = array
+        return shared
+
+    @classmethod
+    def attach(cls, spec: SharedArraySpec) -> "_SharedArray":
+        name, shape, dtype = spec
+        return cls(shape, dtype, name=name)
+
+    def close(self) -> None:
+        self.array = None
+        self.memory.close()
+        if self._owned:
+            self.memory.unlink()
+
+    def __enter__(self) -> "_SharedArray":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+_inpaint_executors: dict[int, ProcessPoolExecutor] = {}
+_inpaint_executors_lock = threading.Lock()
+
+
+def get_inpaint_executor(workers: int = INPAINT_WORKERS) -> ProcessPoolExecutor:
+    """
+    Process pool with `workers` processes, shared by every job in this process.
+
+    Spawned workers import numpy, scipy and cv2 again, so pools are kept for
+    the life of the process rather than started per job.
+    """
+    workers = max(1, workers)
+    with _inpaint_executors_lock:
+        executor = _inpaint_executors.get(workers)
+        if executor is None:
+            if not _inpaint_executors:
+                # Runs when this process exits, before multiprocessing joins
+                # its children and closes the pools' queues (priority 10),
+                # either of which would leave the workers waiting for work
+                Finalize(None, shutdown_inpaint_executors, exitpriority=100)
+            # Spawned like the job workers, forking a threaded process is unsafe
+            executor = ProcessPoolExecutor(
+                max_workers=workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+            _inpaint_executors[workers] = executor
+    return executor
+
+
+def shutdown_inpaint_executors() -> None:
+    with _inpaint_executors_lock:
+        executors = list(_inpaint_executors.values())
+        _inpaint_executors.clear()
+    for executor in executors:
+        executor.shutdown(wait=True, cancel_futures=True)
@@ -1,8 +1,14 @@
+from typing import Any, Optional
+
 import numpy as np
 from scipy.ndimage import binary_dilation, rotate
 
+from all_things_ones.logic.segmentation import LayerMap
 from all_things_ones.repository.files import SaveType, save_image
 
+from .generate_noise import generate_noise
+from .generate_seeds_parallel import INPAINT_WORKERS, generate_seeds_parallel
+
 
 def inpaint(canvases, trans_images, num_images: int, img_size: int):
     """
@@ -11,64 +17,114 @@ def inpaint(canvases, trans_images, num_images: int, img_size: int):
     Yields each processed layer (RGBA) as it's generated.
     """
     for i in range(num_images):
-        if i == num_images - 1:
-            # Last canvas - yield as-is
-            save_image(canvases[i], f"canvas_filled_{i}.png", image_type=SaveType.DEBUG)
-            yield canvases[i]
-            continue
+        hole_mask = trans_images[i][:, :, 3] > 0
+        yield inpaint_layer(canvases[i], hole_mask, i, num_images, img_size)
 
-        # Generate seed on-demand for this specific canvas
-        print(f"Generating camouflage pattern for canvas {i}...")
-        seed = generate_single_seed(canvases[i], i, num_images)
-
-        # Convert seed image to RGBA
-        seed_with_alpha = np.zeros((img_size, img_size, 4), dtype=np.float32)
-        seed_with_alpha[:, :, :3] = seed
-        seed_with_alpha[:, :, 3] = 1.0
-
-        # Apply the transparent mask for this layer
-        # Where trans_mask has alpha>0 (opaque), make seed transparent (cut holes)
-        mask_to_apply = trans_images[i][:, :, 3] > 0
-        seed_with_alpha[mask_to_apply, 3] = 0.0
-        save_image(
-            seed_with_alpha, f"seed_with_holes_{i}.png", image_type=SaveType.DEBUG
-        )
+    print("Finished inpainting process.")
 
-        # Overlay the canvas on top of the seed
-        layer = np.copy(seed_with_alpha)
-        canvas_mask = canvases[i][:, :, 3] > 0
-        layer[canvas_mask] = canvases[i][canvas_mask]
 
-        save_image(layer, f"canvas_filled_{i}.png", image_type=SaveType.DEBUG)
+def inpaint_layer_map(
+    layer_map: LayerMap,
+    num_images: int,
+    img_size: int,
+    workers: int = INPAINT_WORKERS,
+):
+    """
+    Same as inpaint, but reads each canvas from a LayerMap.
 
-        # Yield this layer immediately
-        print("yielding processed layer...")
-        yield layer
+    Only one canvas is materialized at a time. With more than one worker the
+    seeds are generated in that many processes at once, with the same result.
+    """
+    seeds = None
+    if workers > 1 and num_images > 2:
+        seeds = generate_seeds_parallel(layer_map, num_images, workers)
+    for i in range(num_images):
+        canvas = layer_map.canvas(i)
+        hole_mask = layer_map.claimed_before(i)
+        seed = next(seeds) if seeds is not None and i < num_images - 1 else None
+        yield inpaint_layer(canvas, hole_mask, i, num_images, img_size, seed)
 
     print("Finished inpainting process.")
 
 
+def inpaint_layer(
+    canvas: np.ndarray,
+    hole_mask: np.ndarray,
+    canvas_idx: int,
+    num_images: int,
+    img_size: int,
+    seed: Optional[np.ndarray] = None,
+) -> np.ndarray:
+    """
+    Fill the empty parts of one canvas with a camouflage seed pattern.
+
+    The seed is cut away wherever hole_mask is set, so lower layers show
+    through there. It is generated here unless already given.
+    """
+    if canvas_idx == num_images - 1:
+        # Last canvas - return as-is
+        save_image(canvas, f"canvas_filled_{canvas_idx}.png", image_type=SaveType.DEBUG)
+        return canvas
+
+    if seed is None:
+        # Generate seed on-demand for this specific canvas
+        print(f"Generating camouflage pattern for canvas {canvas_idx}...")
+        seed = generate_single_seed(canvas, canvas_idx, num_images)
+
+    # Convert seed image to RGBA
+    seed_with_alpha = np.zeros((img_size, img_size, 4), dtype=np.float32)
+    seed_with_alpha[:, :, :3] = seed
+    seed_with_alpha[:, :, 3] = 1.0
+
+    # Apply the transparent mask for this layer
+    # Where trans_mask has alpha>0 (opaque), make seed transparent (cut holes)
+    seed_with_alpha[hole_mask, 3] = 0.0
+    save_image(
+        seed_with_alpha, f"seed_with_holes_{canvas_idx}.png", image_type=SaveType.DEBUG
+    )
+
+    # Overlay the canvas on top of the seed
+    layer = np.copy(seed_with_alpha)
+    canvas_mask = canvas[:, :, 3] > 0
+    layer[canvas_mask] = canvas[canvas_mask]
+
+    save_image(layer, f"canvas_filled_{canvas_idx}.png", image_type=SaveType.DEBUG)
+
+    print("yielding processed layer...")
+    return layer
+
+
 def generate_single_seed(
-    canvas: np.ndarray, canvas_idx: int, num_images: int
+    canvas: np.ndarray,
+    canvas_idx: int,
+    num_images: int,
+    rng: Optional[np.random.Generator] = None,
 ) -> np.ndarray:
-    np.random.seed(42 + canvas_idx)
+    # Seeded per canvas unless given, so each canvas gets the same seed
+    # whatever else runs in the process
+    if rng is None:
+        rng = np.random.default_rng(42 + canvas_idx)
 
     # Choose technique based on canvas density
     technique = choose_camouflage_technique(canvas)
     print(f"  Using technique: {technique}")
 
     if technique == "blob_duplication":
-        pattern = generate_camouflage_pattern(canvas, num_copies=40, min_blob_size=500)
+        pattern = generate_camouflage_pattern(
+            canvas, num_copies=40, min_blob_size=500, rng=rng
+        )
     elif technique == "fractal":
-        pattern = generate_fractal_pattern(canvas)
+        pattern = generate_fractal_pattern(canvas, rng=rng)
     elif technique == "texture_synthesis":
-        pattern = generate_texture_synthesis(canvas, patch_size=50, num_patches=100)
+        pattern = generate_texture_synthesis(
+            canvas, patch_size=50, num_patches=100, rng=rng
+        )
     else:  # noise
-        pattern = generate_organic_pattern(canvas, scale=150.0, detail=6)
+        pattern = generate_organic_pattern(canvas, scale=150.0, detail=6, rng=rng)
 
     # Add additional obfuscation
     print("  Adding obfuscation layers...")
-    pattern = add_false_patterns(pattern, canvas)
+    pattern = add_false_patterns(pattern, canvas, rng=rng)
 
     save_image(
         pattern, f"generated_pattern_{canvas_idx}.png", image_type=SaveType.DEBUG
@@ -97,7 +153,7 @@ def generate_seeds(canvases: list[np.ndarray], num_images: int) -> list[np.ndarr
             seeds.append(blank_seed)
             continue
         print(f"Generating camouflage pattern for canvas {i}...")
-        np.random.seed(42 + i)
+        rng = np.random.default_rng(42 + i)
 
         # Choose technique based on canvas density
         technique = choose_camouflage_technique(canvas)
@@ -105,18 +161,20 @@ def generate_seeds(canvases: list[np.ndarray], num_images: int) -> list[np.ndarr
 
         if technique == "blob_duplication":
             pattern = generate_camouflage_pattern(
-                canvas, num_copies=40, min_blob_size=500
+                canvas, num_copies=40, min_blob_size=500, rng=rng
             )
         elif technique == "fractal":
-            pattern = generate_fractal_pattern(canvas)
+            pattern = generate_fractal_pattern(canvas, rng=rng)
         elif technique == "texture_synthesis":
-            pattern = generate_texture_synthesis(canvas, patch_size=50, num_patches=100)
+            pattern = generate_texture_synthesis(
+                canvas, patch_size=50, num_patches=100, rng=rng
+            )
         else:  # noise
-            pattern = generate_organic_pattern(canvas, scale=150.0, detail=6)
+            pattern = generate_organic_pattern(canvas, scale=150.0, detail=6, rng=rng)
 
         # Add additional obfuscation
         print("  Adding obfuscation layers...")
-        pattern = add_false_patterns(pattern, canvas)
+        pattern = add_false_patterns(pattern, canvas, rng=rng)
 
         save_image(pattern, f"generated_pattern_{i}.png", image_type=SaveType.DEBUG)
         seeds.append(pattern)
@@ -139,10 +197,19 @@ def choose_camouflage_technique(canvas: np.ndarray) -> str:
         return "texture_synthesis"  # Dense canvas, synthesize texture
 
 
-def add_false_patterns(pattern: np.ndarray, canvas: np.ndarray) -> np.ndarray:
+def add_false_patterns(
+    pattern: np.ndarray,
+    canvas: np.ndarray,
+    batch_shapes: bool = False,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
     """
     Add fake geometric patterns and noise to further obfuscate the real content.
+
+    With batch_shapes the shapes are first composited into one coverage
+    buffer, which is then blended over the pattern in a single pass.
     """
+    rng = np.random.default_rng(rng)
     height, width = pattern.shape[:2]
     result = pattern.copy()
 
@@ -157,56 +224,98 @@ def add_false_patterns(pattern: np.ndarray, canvas: np.ndarray) -> np.ndarray:
         std_color = np.array([0.1, 0.1, 0.1])
 
     # Add random geometric shapes (circles, rectangles, lines)
-    num_shapes = np.random.randint(10, 30)
+    num_shapes = rng.integers(10, 30)
+    shapes = [
+        shape
+        for shape in (
+            _random_false_shape(height, width, mean_color, std_color, rng)
+            for _ in range(num_shapes)
+        )
+        if shape is not None
+    ]
+    if batch_shapes:
+        _blend_false_shapes_batched(result, shapes)
+    else:
+        for region, mask, color in shapes:
+            _blend_false_shape(result[region + (slice(0, 3),)], mask, color)
 
-    for _ in range(num_shapes):
-        # Random color from canvas palette
-        color = np.clip(mean_color + np.random.randn(3) * std_color, 0, 1)
+    # Add textured noise based on canvas colors
+    noise_scale = generate_noise(height, width, scale=80, octaves=4, seed=rng)
+    for c in range(3):
+        color_noise = (noise_scale - 0.5) * std_color[c] * 2
+        result[:, :, c] = np.clip(result[:, :, c] + color_noise * 0.2, 0, 1)
 
-        shape_type = np.random.choice(["circle", "rectangle", "line"])
+    return result
 
-        if shape_type == "circle":
-            center_y = np.random.randint(0, height)
-            center_x = np.random.randint(0, width)
-            radius = np.random.randint(20, 100)
 
-            y, x = np.ogrid[:height, :width]
-            mask = (x - center_x) ** 2 + (y - center_y) ** 2 <= radius**2
+# Opacity of the fake shapes
+FALSE_SHAPE_ALPHA = 0.3
 
-            # Blend circle
-            alpha = 0.3
-            for c in range(3):
-                result[mask, c] = result[mask, c] * (1 - alpha) + color[c] * alpha
 
-        elif shape_type == "rectangle":
-            y1 = np.random.randint(0, height - 50)
-            x1 = np.random.randint(0, width - 50)
-            rect_h = np.random.randint(30, 150)
-            rect_w = np.random.randint(30, 150)
+def _random_false_shape(
+    height: int,
+    width: int,
+    mean_color: np.ndarray,
+    std_color: np.ndarray,
+    rng: np.random.Generator,
+) -> Optional[tuple[tuple[slice, slice], Any, np.ndarray]]:
+    # Returns the shape's bounding box, its mask within the box (Ellipsis for
+    # the whole box) and its color, or None for shapes that draw nothing
+    color = np.clip(mean_color + rng.standard_normal(3) * std_color, 0, 1)
 
-            y2 = min(y1 + rect_h, height)
-            x2 = min(x1 + rect_w, width)
+    shape_type = rng.choice(["circle", "rectangle", "line"])
 
-            # Blend rectangle
-            alpha = 0.3
-            for c in range(3):
-                result[y1:y2, x1:x2, c] = (
-                    result[y1:y2, x1:x2, c] * (1 - alpha) + color[c] * alpha
-                )
+    if shape_type == "circle":
+        center_y = int(rng.integers(0, height))
+        center_x = int(rng.integers(0, width))
+        radius = int(rng.integers(20, 100))
 
-    # Add textured noise based on canvas colors
-    noise_scale = generate_perlin_noise(height, width, scale=80, octaves=4)
-    for c in range(3):
-        color_noise = (noise_scale - 0.5) * std_color[c] * 2
-        result[:, :, c] = np.clip(result[:, :, c] + color_noise * 0.2, 0, 1)
+        # Only rasterize within the circle's bounding box
+        y1, y2 = max(center_y - radius, 0), min(center_y + radius + 1, height)
+        x1, x2 = max(center_x - radius, 0), min(center_x + radius + 1, width)
+        y, x = np.ogrid[y1:y2, x1:x2]
+        mask = (x - center_x) ** 2 + (y - center_y) ** 2 <= radius**2
+        return (slice(y1, y2), slice(x1, x2)), mask, color
 
-    return result
+    if shape_type == "rectangle":
+        y1 = int(rng.integers(0, height - 50))
+        x1 = int(rng.integers(0, width - 50))
+        rect_h = int(rng.integers(30, 150))
+        rect_w = int(rng.integers(30, 150))
+
+        y2 = min(y1 + rect_h, height)
+        x2 = min(x1 + rect_w, width)
+        return (slice(y1, y2), slice(x1, x2)), ..., color
+
+    return None
 
 
-def generate_fractal_pattern(canvas: np.ndarray) -> np.ndarray:
+def _blend_false_shape(region: np.ndarray, mask: Any, color: np.ndarray) -> None:
+    # All three channels at once, the same arithmetic as blending each alone
+    region[mask] = region[mask] * (1 - FALSE_SHAPE_ALPHA) + color * FALSE_SHAPE_ALPHA
+
+
+def _blend_false_shapes_batched(
+    result: np.ndarray, shapes: list[tuple[tuple[slice, slice], Any, np.ndarray]]
+) -> None:
+    # Composite the shapes in order into how much of the pattern is kept and
+    # how much color is painted over it, then apply both in one pass
+    height, width = result.shape[:2]
+    keep = np.ones((height, width), dtype=np.float32)
+    paint = np.zeros((height, width, 3), dtype=np.float32)
+    for region, mask, color in shapes:
+        _blend_false_shape(paint[region], mask, color)
+        keep[region][mask] *= 1 - FALSE_SHAPE_ALPHA
+    result[:, :, :3] = result[:, :, :3] * keep[:, :, np.newaxis] + paint
+
+
+def generate_fractal_pattern(
+    canvas: np.ndarray, rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
     """
     Generate a fractal-like pattern that mimics the canvas at different scales.
     """
+    rng = np.random.default_rng(rng)
     height, width = canvas.shape[:2]
     pattern = np.zeros((height, width, 3), dtype=np.float32)
 
@@ -215,7 +324,7 @@ def generate_fractal_pattern(canvas: np.ndarray) -> np.ndarray:
     if np.any(content_mask):
         content_colors = canvas[content_mask, :3]
         sampled_colors = content_colors[
-            np.random.choice(len(content_colors), min(50, len(content_colors)))
+            rng.choice(len(content_colors), min(50, len(content_colors)))
         ]
     else:
         sampled_colors = np.array([[0.5, 0.5, 0.5]])
@@ -225,7 +334,7 @@ def generate_fractal_pattern(canvas: np.ndarray) -> np.ndarray:
     weights = [0.4, 0.3, 0.2, 0.1]
 
     for scale, weight in zip(scales, weights):
-        noise = generate_perlin_noise(height, width, scale=scale, octaves=4)
+        noise = generate_noise(height, width, scale=scale, octaves=4, seed=rng)
 
         # Map noise to colors
         for i, color in enumerate(sampled_colors):
@@ -240,87 +349,123 @@ def generate_fractal_pattern(canvas: np.ndarray) -> np.ndarray:
     return pattern
 
 
+# Patches gathered at once, about 10MB of patches and masks at patch_size 50
+TEXTURE_PATCH_BATCH = 256
+
+
 def generate_texture_synthesis(
-    canvas: np.ndarray, patch_size: int = 50, num_patches: int = 100
+    canvas: np.ndarray,
+    patch_size: int = 50,
+    num_patches: int = 100,
+    rng: Optional[np.random.Generator] = None,
 ) -> np.ndarray:
     """
     Synthesize texture by extracting and recombining patches from the canvas.
     Similar to Image Quilting algorithm.
     """
+    rng = np.random.default_rng(rng)
     height, width = canvas.shape[:2]
     pattern = np.zeros((height, width, 3), dtype=np.float32)
 
     content_mask = canvas[:, :, 3] > 0
 
     if not np.any(content_mask):
-        return generate_organic_pattern(canvas, scale=150.0, detail=6)
-
-    # Find all valid patch locations in canvas
-    valid_patches = []
-    for y in range(0, height - patch_size, patch_size // 2):
-        for x in range(0, width - patch_size, patch_size // 2):
-            patch_mask = content_mask[y : y + patch_size, x : x + patch_size]
-            if np.sum(patch_mask) > (
-                patch_size * patch_size * 0.1
-            ):  # At least 10% content
-                patch_rgb = canvas[y : y + patch_size, x : x + patch_size, :3].copy()
-                valid_patches.append((patch_rgb, patch_mask))
-
-    if len(valid_patches) == 0:
-        return generate_organic_pattern(canvas, scale=150.0, detail=6)
-
-    print(f"    Found {len(valid_patches)} valid patches")
-
-    # Fill pattern with patches
-    for _ in range(num_patches):
-        # Pick random patch
-        patch_rgb, patch_mask = valid_patches[np.random.randint(len(valid_patches))]
-
-        # Random position
-        y = np.random.randint(0, height - patch_size)
-        x = np.random.randint(0, width - patch_size)
-
-        # Random transform
-        if np.random.random() > 0.5:
-            patch_rgb = np.fliplr(patch_rgb)
-            patch_mask = np.fliplr(patch_mask)
-        if np.random.random() > 0.5:
-            patch_rgb = np.flipud(patch_rgb)
-            patch_mask = np.flipud(patch_mask)
-
-        # Rotate
-        angle = np.random.choice([0, 90, 180, 270])
-        if angle > 0:
-            patch_rgb = rotate(patch_rgb, angle, reshape=False, axes=(0, 1), order=1)
-            patch_mask = (
-                rotate(patch_mask.astype(float), angle, reshape=False, order=0) > 0.5
-            )
+        return generate_organic_pattern(canvas, scale=150.0, detail=6, rng=rng)
+
+    # Find all valid patch locations in canvas, with at least 10% content
+    step = patch_size // 2
+    grid_y = np.arange(0, height - patch_size, step)
+    grid_x = np.arange(0, width - patch_size, step)
+    content = _window_sums(content_mask, patch_size, grid_y, grid_x)
+    valid_y, valid_x = np.nonzero(content > patch_size * patch_size * 0.1)
+    source_y, source_x = grid_y[valid_y], grid_x[valid_x]
+
+    if len(source_y) == 0:
+        return generate_organic_pattern(canvas, scale=150.0, detail=6, rng=rng)
+
+    print(f"    Found {len(source_y)} valid patches")
+
+    # Draw every patch's source, position and transform up front
+    picks = rng.integers(len(source_y), size=num_patches)
+    target_y = rng.integers(0, height - patch_size, size=num_patches)
+    target_x = rng.integers(0, width - patch_size, size=num_patches)
+    flips = rng.random((num_patches, 2)) > 0.5
+    turns = rng.integers(0, 4, size=num_patches)
+    color_shifts = ((rng.random((num_patches, 3)) - 0.5) * 0.15).astype(np.float32)
+    transforms = flips[:, 0] * 8 + flips[:, 1] * 4 + turns
+
+    # Patches are gathered as rows of pixels, indexed by source corner plus
+    # each transformed pixel's offset
+    pixels = canvas.reshape(height * width, -1)
+    pixel_masks = np.repeat(content_mask.reshape(-1, 1), 3, axis=1)
+    corners = (source_y * width + source_x)[picks]
+    offsets = _patch_transform_offsets(patch_size, width)
+
+    alpha = np.float32(0.7)
+    blended = np.empty((patch_size, patch_size, 3), dtype=np.float32)
+    for start in range(0, num_patches, TEXTURE_PATCH_BATCH):
+        batch = slice(start, start + TEXTURE_PATCH_BATCH)
+
+        # Gather a batch of flipped and rotated patches at once, then add the
+        # slight color variation and weight them all together
+        indices = corners[batch, np.newaxis, np.newaxis] + offsets[transforms[batch]]
+        patches = np.take(pixels, indices, axis=0)[..., :3]
+        patches = patches + color_shifts[batch, np.newaxis, np.newaxis]
+        np.clip(patches, 0, 1, out=patches)
+        patches *= alpha
+        masks = np.take(pixel_masks, indices, axis=0)
+
+        # Blend into pattern in order, since later patches cover earlier ones
+        for patch, mask, y, x in zip(patches, masks, target_y[batch], target_x[batch]):
+            region = pattern[y : y + patch_size, x : x + patch_size]
+            np.multiply(region, 1 - alpha, out=blended)
+            blended += patch
+            np.copyto(region, blended, where=mask)
+
+    # Fill empty areas. Patches are clipped to [0, 1], so a pixel is empty when
+    # its channels sum to 0, and summing channel views beats reducing axis 2
+    empty_mask = (pattern[:, :, 0] + pattern[:, :, 1] + pattern[:, :, 2]) == 0
+    if np.any(empty_mask):
+        background = generate_background_fill(canvas, rng)
+        np.copyto(pattern, background, where=empty_mask[:, :, np.newaxis])
 
-        # Slight color variation
-        color_shift = (np.random.rand(3) - 0.5) * 0.15
-        patch_rgb = np.clip(patch_rgb + color_shift, 0, 1)
+    return pattern
 
-        # Blend into pattern
-        alpha = 0.7
-        for c in range(3):
-            pattern[y : y + patch_size, x : x + patch_size, c] = np.where(
-                patch_mask,
-                patch_rgb[:, :, c] * alpha
-                + pattern[y : y + patch_size, x : x + patch_size, c] * (1 - alpha),
-                pattern[y : y + patch_size, x : x + patch_size, c],
-            )
 
-    # Fill empty areas
-    empty_mask = np.all(pattern == 0, axis=2)
-    if np.any(empty_mask):
-        background = generate_background_fill(canvas)
-        pattern[empty_mask] = background[empty_mask]
+def _patch_transform_offsets(patch_size: int, width: int) -> np.ndarray:
+    # Offset from the patch corner, in pixels of a row-major image of the given
+    # width, of each pixel of a patch under every transform
+    # 8 * flip_lr + 4 * flip_ud + quarter turns, applied in that order
+    rows, cols = np.indices((patch_size, patch_size))
+    offset = rows * width + cols
+    offsets = []
+    for flipped_lr in (offset, np.fliplr(offset)):
+        for flipped in (flipped_lr, np.flipud(flipped_lr)):
+            offsets.extend(np.rot90(flipped, turns) for turns in range(4))
+    return np.stack(offsets)
 
-    return pattern
+
+def _window_sums(
+    mask: np.ndarray, size: int, top: np.ndarray, left: np.ndarray
+) -> np.ndarray:
+    # Sum of mask over the size x size window at each (top, left), from a
+    # summed-area table with a leading row and column of zeros
+    table = np.zeros((mask.shape[0] + 1, mask.shape[1] + 1), dtype=np.int32)
+    np.cumsum(np.cumsum(mask, axis=0, dtype=np.int32), axis=1, out=table[1:, 1:])
+    top, left = top[:, np.newaxis], left[np.newaxis, :]
+    return (
+        table[top + size, left + size]
+        - table[top, left + size]
+        - table[top + size, left]
+        + table[top, left]
+    )
 
 
 def generate_camouflage_pattern(
-    canvas: np.ndarray, num_copies: int = 25, min_blob_size: int = 500
+    canvas: np.ndarray,
+    num_copies: int = 25,
+    min_blob_size: int = 500,
+    rng: Optional[np.random.Generator] = None,
 ) -> np.ndarray:
     """
     Generate a camouflage pattern by extracting and duplicating elements from the canvas.
@@ -329,10 +474,12 @@ def generate_camouflage_pattern(
         canvas: The canvas to mimic (RGBA format)
         num_copies: Number of element copies to create
         min_blob_size: Minimum size of blobs to extract (in pixels)
+        rng: Random generator, a fresh one if None
 
     Returns:
         RGB image with duplicated and transformed canvas elements
     """
+    rng = np.random.default_rng(rng)
     height, width = canvas.shape[:2]
     pattern = np.zeros((height, width, 3), dtype=np.float32)
 
@@ -344,7 +491,7 @@ def generate_camouflage_pattern(
 
     if len(blobs) == 0:
         print("  No elements found, using noise pattern")
-        return generate_organic_pattern(canvas, scale=150.0, detail=6)
+        return generate_organic_pattern(canvas, scale=150.0, detail=6, rng=rng)
 
     # Save debug info about blob sizes
     blob_sizes = [np.sum(blob[0]) for blob in blobs]
@@ -359,20 +506,22 @@ def generate_camouflage_pattern(
         # Pick a random blob (favor larger blobs)
         blob_weights = np.array([np.sum(blob[0]) for blob in blobs])
         blob_weights = blob_weights / blob_weights.sum()
-        blob_idx = np.random.choice(len(blobs), p=blob_weights)
+        blob_idx = rng.choice(len(blobs), p=blob_weights)
 
         blob_mask, blob_rgb, bbox = blobs[blob_idx]
 
         # Apply random transformations
-        transformed_mask, transformed_rgb = apply_random_transform(blob_mask, blob_rgb)
+        transformed_mask, transformed_rgb = apply_random_transform(
+            blob_mask, blob_rgb, rng
+        )
 
         # Find a random position to place it
         blob_h, blob_w = transformed_mask.shape
         max_y = max(1, height - blob_h)
         max_x = max(1, width - blob_w)
 
-        pos_y = np.random.randint(0, max_y)
-        pos_x = np.random.randint(0, max_x)
+        pos_y = int(rng.integers(0, max_y))
+        pos_x = int(rng.integers(0, max_x))
 
         # Blend the blob into the pattern
         blend_blob_into_pattern(
@@ -382,7 +531,7 @@ def generate_camouflage_pattern(
     # Fill any remaining empty space with subtle noise
     empty_mask = np.all(pattern == 0, axis=2)
     if np.any(empty_mask):
-        background = generate_background_fill(canvas)
+        background = generate_background_fill(canvas, rng)
         pattern[empty_mask] = background[empty_mask]
 
     return pattern
@@ -441,27 +590,33 @@ def extract_canvas_blobs(canvas: np.ndarray, min_blob_size: int = 500) -> list:
     return blobs
 
 
-def apply_random_transform(blob_mask: np.ndarray, blob_rgb: np.ndarray):
+def apply_random_transform(
+    blob_mask: np.ndarray,
+    blob_rgb: np.ndarray,
+    rng: Optional[np.random.Generator] = None,
+):
     """
     Apply random transformations to a blob (rotation, flip, slight color variation).
     """
+    rng = np.random.default_rng(rng)
+
     # Random rotation
-    angle = np.random.choice([0, 90, 180, 270])
+    angle = rng.choice([0, 90, 180, 270])
     if angle > 0:
         blob_mask = rotate(blob_mask.astype(float), angle, reshape=True, order=0) > 0.5
         blob_rgb = rotate(blob_rgb, angle, reshape=True, axes=(0, 1), order=1)
 
     # Random flip
-    if np.random.random() > 0.5:
+    if rng.random() > 0.5:
         blob_mask = np.fliplr(blob_mask)
         blob_rgb = np.fliplr(blob_rgb)
 
-    if np.random.random() > 0.5:
+    if rng.random() > 0.5:
         blob_mask = np.flipud(blob_mask)
         blob_rgb = np.flipud(blob_rgb)
 
     # Slight color variation
-    color_shift = (np.random.rand(3) - 0.5) * 0.2
+    color_shift = (rng.random(3) - 0.5) * 0.2
     blob_rgb = np.clip(blob_rgb + color_shift, 0, 1)
 
     return blob_mask, blob_rgb
@@ -507,10 +662,13 @@ def blend_blob_into_pattern(
         )
 
 
-def generate_background_fill(canvas: np.ndarray) -> np.ndarray:
+def generate_background_fill(
+    canvas: np.ndarray, rng: Optional[np.random.Generator] = None
+) -> np.ndarray:
     """
     Generate a subtle background fill based on canvas colors.
     """
+    rng = np.random.default_rng(rng)
     height, width = canvas.shape[:2]
     content_mask = canvas[:, :, 3] > 0
     content_colors = canvas[content_mask, :3]
@@ -522,27 +680,31 @@ def generate_background_fill(canvas: np.ndarray) -> np.ndarray:
     mean_color = np.mean(content_colors, axis=0)
 
     # Generate subtle noise
-    noise = np.random.randn(height, width, 3) * 0.08
+    noise = rng.standard_normal((height, width, 3), dtype=np.float32) * 0.08
     background = np.clip(mean_color + noise, 0, 1)
 
     return background
 
 
 def generate_organic_pattern(
-    canvas: np.ndarray, scale: float = 80.0, detail: int = 6
+    canvas: np.ndarray,
+    scale: float = 80.0,
+    detail: int = 6,
+    rng: Optional[np.random.Generator] = None,
 ) -> np.ndarray:
     """
-    Generate an organic pattern using Perlin noise and canvas color sampling.
+    Generate an organic pattern using fractal noise and canvas color sampling.
     Fallback for when no blobs are found.
     """
+    rng = np.random.default_rng(rng)
     height, width = canvas.shape[:2]
-    sampled_colors = sample_colors_from_canvas(canvas, num_samples=30)
+    sampled_colors = sample_colors_from_canvas(canvas, num_samples=30, rng=rng)
 
     print("  Generating noise layers...")
-    noise_r = generate_perlin_noise(height, width, scale=scale, octaves=detail)
-    noise_g = generate_perlin_noise(height, width, scale=scale * 1.2, octaves=detail)
-    noise_b = generate_perlin_noise(height, width, scale=scale * 0.8, octaves=detail)
-    color_selector = generate_perlin_noise(height, width, scale=scale * 2, octaves=4)
+    noise_r = generate_noise(height, width, scale=scale, octaves=detail, seed=rng)
+    noise_g = generate_noise(height, width, scale=scale * 1.2, octaves=detail, seed=rng)
+    noise_b = generate_noise(height, width, scale=scale * 0.8, octaves=detail, seed=rng)
+    color_selector = generate_noise(height, width, scale=scale * 2, octaves=4, seed=rng)
 
     print("  Mapping colors...")
     pattern = np.zeros((height, width, 3), dtype=np.float32)
@@ -559,17 +721,22 @@ def generate_organic_pattern(
             variation = (noise_val - 0.5) * 0.3
             pattern[mask, c] = np.clip(base_color + variation[mask], 0, 1)
 
-    fine_noise = generate_perlin_noise(height, width, scale=20, octaves=3)
+    fine_noise = generate_noise(height, width, scale=20, octaves=3, seed=rng)
     fine_noise = (fine_noise - 0.5) * 0.1
     pattern = np.clip(pattern + fine_noise[:, :, np.newaxis], 0, 1)
 
     return pattern
 
 
-def sample_colors_from_canvas(canvas: np.ndarray, num_samples: int = 20) -> np.ndarray:
+def sample_colors_from_canvas(
+    canvas: np.ndarray,
+    num_samples: int = 20,
+    rng: Optional[np.random.Generator] = None,
+) -> np.ndarray:
     """
     Sample representative colors from the canvas content.
     """
+    rng = np.random.default_rng(rng)
     content_mask = canvas[:, :, 3] > 0
     content_colors = canvas[content_mask, :3]
 
@@ -577,34 +744,9 @@ def sample_colors_from_canvas(canvas: np.ndarray, num_samples: int = 20) -> np.n
         return np.array([[0.5, 0.5, 0.5]])
 
     if len(content_colors) > num_samples:
-        indices = np.random.choice(len(content_colors), num_samples, replace=False)
+        indices = rng.choice(len(content_colors), num_samples, replace=False)
         sampled_colors = content_colors[indices]
     else:
         sampled_colors = content_colors
 
     return sampled_colors
-
-
-def generate_perlin_noise(
-    height: int, width: int, scale: float = 100.0, octaves: int = 6
-) -> np.ndarray:
-    """
-    Generate 2D Perlin-like noise using multiple octaves of random noise.
-    """
-    noise = np.zeros((height, width))
-
-    for octave in range(octaves):
-        freq = 2**octave
-        amp = 1.0 / (2**octave)
-
-        grid_h = int(height / scale * freq) + 2
-        grid_w = int(width / scale * freq) + 2
-        grid = np.random.randn(grid_h, grid_w)
-
-        from scipy.ndimage import zoom
-
-        zoomed = zoom(grid, (height / grid_h, width / grid_w), order=1)
-        noise += zoomed[:height, :width] * amp
-
-    noise = (noise - noise.min()) / (noise.max() - noise.min())
-    return noise
@@ -0,0 +1,9 @@
+from .estimate_pipeline_cost import PipelineCost, estimate_pipeline_cost
+from .process_image_pipeline import process_image_pipeline, replay_cached_result
+
+__all__ = [
+    "PipelineCost",
+    "estimate_pipeline_cost",
+    "process_image_pipeline",
+    "replay_cached_result",
+]
@@ -0,0 +1,59 @@
+import os
+from collections import deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Iterator, Optional
+
+# zlib, libwebp and cv2 release the GIL while compressing, so threads encode
+# in parallel with the pipeline's own compute
+ENCODE_WORKERS = int(os.environ.get("ENCODE_WORKERS", "2"))
+
+
+class EncodeStage:
+    """
+    Run encode jobs on a thread pool while the caller keeps computing.
+
+    Results are handed back strictly in submission order: `ready` yields the
+    finished results at the front of the queue without waiting, `drain` waits
+    for everything left. At most `max_pending` jobs are queued, so inputs
+    waiting to be encoded do not pile up in memory.
+    """
+
+    def __init__(
+        self,
+        executor: Optional[ThreadPoolExecutor] = None,
+        max_pending: int = ENCODE_WORKERS * 2,
+    ):
+        self._executor = executor or get_encode_executor()
+        self.max_pending = max(1, max_pending)
+        self._pending: deque[Future] = deque()
+
+    def submit(self, job: Callable[..., Any], *args) -> None:
+        if len(self._pending) >= self.max_pending:
+            self._pending[0].result()
+        self._pending.append(self._executor.submit(job, *args))
+
+    def add(self, result: Any) -> None:
+        """Queue an already available result, keeping it in order."""
+        future = Future()
+        future.set_result(result)
+        self._pending.append(future)
+
+    def ready(self) -> Iterator[Any]:
+        while self._pending and self._pending[0].done():
+            yield self._pending.popleft().result()
+
+    def drain(self) -> Iterator[Any]:
+        while self._pending:
+            yield self._pending.popleft().result()
+
+
+_encode_executor: Optional[ThreadPoolExecutor] = None
+
+
+def get_encode_executor() -> ThreadPoolExecutor:
+    global _encode_executor
+    if _encode_executor is None:
+        _encode_executor = ThreadPoolExecutor(
+            max_workers=max(1, ENCODE_WORKERS), thread_name_prefix="encode"
+        )
+    return _encode_executor
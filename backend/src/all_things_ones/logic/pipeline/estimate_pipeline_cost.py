@@ -0,0 +1,53 @@
+from dataclasses import dataclass
+
+from all_things_ones.logic.inpainting.generate_seeds_parallel import INPAINT_WORKERS
+
+# Peak traced memory of process_image_pipeline per output pixel. Layers are
+# streamed one at a time, so this does not grow with num_images. Measured with
+# tracemalloc at 512 and 1024px, rounded up.
+PEAK_BYTES_PER_PIXEL = 180
+# Compute per output pixel and layer on one core, measured the same way
+SECONDS_PER_PIXEL_LAYER = 1.5e-6
+# Decoding holds the upload as BGR uint8, assuming no reduced decode
+DECODE_BYTES_PER_PIXEL = 3
+# Each inpainting worker process generating a seed, including its canvas
+SEED_WORKER_BYTES_PER_PIXEL = 150
+# Shared target and owner map, plus two float32 RGB seed slots per worker
+SHARED_BYTES_PER_PIXEL = 13
+SEED_SLOT_BYTES_PER_PIXEL = 2 * 12
+
+
+@dataclass(frozen=True)
+class PipelineCost:
+    memory_bytes: int
+    seconds: float
+
+
+def estimate_pipeline_cost(
+    upload_width: int,
+    upload_height: int,
+    upload_bytes: int,
+    img_size: int,
+    num_images: int,
+    inpaint_workers: int = INPAINT_WORKERS,
+) -> PipelineCost:
+    """
+    Estimate the peak memory and compute of one process_image_pipeline run.
+
+    The encoded upload is held for the whole run, on top of whichever is
+    larger of decoding it and processing the resized image. Inpainting worker
+    processes add their own memory.
+    """
+    output_pixels = img_size * img_size
+    decode_bytes = upload_width * upload_height * DECODE_BYTES_PER_PIXEL
+    memory_bytes = upload_bytes + max(
+        decode_bytes, output_pixels * PEAK_BYTES_PER_PIXEL
+    )
+    workers = min(inpaint_workers, num_images - 1)
+    if workers > 1:
+        memory_bytes += output_pixels * (
+            SHARED_BYTES_PER_PIXEL
+            + workers * (SEED_WORKER_BYTES_PER_PIXEL + SEED_SLOT_BYTES_PER_PIXEL)
+        )
+    seconds = output_pixels * num_images * SECONDS_PER_PIXEL_LAYER
+    return PipelineCost(memory_bytes=memory_bytes, seconds=seconds)
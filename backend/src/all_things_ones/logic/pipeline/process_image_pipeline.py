@@ -0,0 +1,141 @@
+from typing import Iterator, Optional
+
+import numpy as np
+
+from all_things_ones.logic.conversion import load_image_from_bytes, save_image_to_bytes
+from all_things_ones.logic.events import (
+    create_complete_message,
+    create_error_message,
+    create_image_message,
+    create_status_message,
+)
+from all_things_ones.logic.inpainting import inpaint_layer_map
+from all_things_ones.logic.segmentation import segment_into_layer_map
+from all_things_ones.repository.cache import (
+    get_layer_store,
+    get_result_cache,
+    get_result_cache_key,
+)
+from all_things_ones.repository.files import SaveType, debug_output, save_image
+
+from .encode_stage import EncodeStage
+
+# Route the API serves stored layers from
+LAYER_URL = "/jobs/{job_id}/layers/{name}"
+
+
+def process_image_pipeline(
+    target_bytes: bytes,
+    num_images: int,
+    img_size: int,
+    cache_key: Optional[str] = None,
+    job_id: Optional[str] = None,
+) -> Iterator[str]:
+    """
+    Run the full segmentation and inpainting pipeline, yielding SSE messages.
+
+    This is synchronous and CPU-bound, so it is meant to be run in a worker
+    process or thread rather than on the event loop. Each layer is written to
+    the layer store under `job_id` and announced by URL. The final layers are
+    stored in the result cache under `cache_key`.
+    """
+    if cache_key is None:
+        cache_key = get_result_cache_key(target_bytes, num_images, img_size)
+    if job_id is None:
+        job_id = get_layer_store().create_job()
+    # Debug images go to a folder per job, for a sample of jobs
+    with debug_output(job_id):
+        try:
+            yield create_status_message("Loading image...")
+            # Resized while decoding, the full resolution upload is never
+            # converted to float
+            target_img = load_image_from_bytes(target_bytes, (img_size, img_size, 3))
+            save_image(target_img, "target_img_resized.png", image_type=SaveType.DEBUG)
+            yield create_status_message(f"Image loaded with shape {target_img.shape}")
+
+            yield create_status_message("Segmenting image by frequency")
+
+            # Layers are encoded on a thread pool while the next one is computed,
+            # messages still come out in order
+            encoder = EncodeStage()
+
+            # Layers are kept as one owner map over the target and only expanded
+            # to RGBA canvases one at a time for encoding
+            for index, layer_map in enumerate(
+                segment_into_layer_map(
+                    target_img,
+                    num_images,
+                    img_size,
+                    search="bisection",
+                    coarse_scale=4,
+                )
+            ):
+                encoder.submit(
+                    encode_layer,
+                    job_id,
+                    f"segment_{index}.png",
+                    layer_map.canvas(index),
+                    index,
+                )
+                yield from encoder.ready()
+
+            encoder.add(create_status_message("Inpainting images"))
+            final_layers = [None] * num_images
+            for i, layer in enumerate(
+                inpaint_layer_map(layer_map, num_images, img_size)
+            ):
+                encoder.submit(
+                    encode_layer, job_id, f"final_{i}.png", layer, i, final_layers
+                )
+                yield from encoder.ready()
+            yield from encoder.drain()
+
+            combined = layer_map.combined()
+            save_image(combined, "combined_image.png", image_type=SaveType.DEBUG)
+
+            get_result_cache().put(cache_key, final_layers)
+            yield create_complete_message("Processing complete")
+
+        except Exception as e:
+            print(e)
+            yield create_error_message(str(e))
+
+
+def replay_cached_result(layers: list[bytes], job_id: str) -> Iterator[str]:
+    """
+    Yield the SSE messages for a previously computed set of final layers.
+    """
+    yield create_status_message("Loaded cached result")
+    for i, image_bytes in enumerate(layers):
+        yield publish_layer(job_id, f"final_{i}.png", image_bytes, i)
+    yield create_complete_message("Processing complete")
+
+
+def encode_layer(
+    job_id: str,
+    name: str,
+    layer: np.ndarray,
+    index: int,
+    encoded_layers: Optional[list] = None,
+) -> str:
+    """
+    Encode and publish one layer, returning its SSE message.
+
+    Runs on the encode thread pool. If given, the bytes are also stored at
+    `encoded_layers[index]`.
+    """
+    image_bytes = save_image_to_bytes(layer, format="PNG")
+    if encoded_layers is not None:
+        encoded_layers[index] = image_bytes
+    return publish_layer(job_id, name, image_bytes, index)
+
+
+def publish_layer(job_id: str, name: str, image_bytes: bytes, index: int) -> str:
+    """
+    Store an encoded layer for download and return the SSE message announcing it.
+
+    Layers are served by the API under LAYER_URL, so the stream itself only
+    carries the small URL rather than the image.
+    """
+    get_layer_store().put(job_id, name, image_bytes)
+    return create_image_message(LAYER_URL.format(job_id=job_id, name=name), index)
@@ -1,3 +1,4 @@
-from .segment_by_frequency import segment_by_frequency
+from .model import UNCLAIMED, LayerMap
+from .segment_by_frequency import segment_by_frequency, segment_into_layer_map
 
-__all__ = ["segment_by_frequency"]
+__all__ = ["LayerMap", "segment_by_frequency", "segment_into_layer_map", "UNCLAIMED"]
@@ -0,0 +1,56 @@
+from dataclasses import dataclass
+
+import numpy as np
+
+# Owner value for pixels not yet assigned to a layer
+UNCLAIMED = 255
+
+
+@dataclass(frozen=True)
+class LayerMap:
+    """
+    Compact representation of a set of layer canvases.
+
+    Every pixel belongs to exactly one layer, so instead of one RGBA canvas per
+    layer we keep the target image and a uint8 map of which layer owns each
+    pixel. RGBA canvases are only built when something needs them.
+    """
+
+    # Target image (H, W, 3) that every layer takes its colours from
+    target: np.ndarray
+    # An array with values from 0 to num_images-1, or UNCLAIMED
+    owner: np.ndarray
+    num_images: int
+
+    def layer_mask(self, index: int) -> np.ndarray:
+        return self.owner == index
+
+    def claimed_before(self, index: int) -> np.ndarray:
+        """Pixels owned by any layer below `index`."""
+        return self.owner < index
+
+    def canvas(self, index: int) -> np.ndarray:
+        """Materialize layer `index` as an RGBA float32 canvas."""
+        height, width = self.owner.shape
+        mask = self.layer_mask(index)
+        canvas = np.zeros((height, width, 4), dtype=np.float32)
+        canvas[mask, :3] = self.target[mask]
+        canvas[mask, 3] = 1.0
+        return canvas
+
+    def trans_image(self, index: int) -> np.ndarray:
+        """
+        Materialize the RGBA mask that is opaque wherever a lower layer shows.
+        """
+        height, width = self.owner.shape
+        if index == 0:
+            return np.zeros((height, width, 4), dtype=np.float32)
+        trans_img = np.empty((height, width, 4), dtype=np.float32)
+        trans_img[:, :, :3] = 1.0
+        trans_img[:, :, 3] = self.claimed_before(index)
+        return trans_img
+
+    def combined(self) -> np.ndarray:
+        """Equivalent to combine_layers_by_transparency over every canvas."""
+        claimed = self.owner != UNCLAIMED
+        return np.where(claimed[:, :, np.newaxis], self.target, 0).astype(np.float32)
@@ -1,64 +1,268 @@
+import cv2
 import numpy as np
 
-from all_things_ones.logic.core import low_pass_filter
+from all_things_ones.logic.core import GaussianScaleSpace
 from all_things_ones.repository.files import SaveType, save_image
 
+from .model import UNCLAIMED, LayerMap
 
-def segment_by_frequency(target_img, canvases, num_images: int, img_size: int):
-    masks = [np.ones((img_size, img_size), dtype=np.bool) for _ in range(num_images)]
+
+def segment_by_frequency(
+    target_img,
+    canvases,
+    num_images: int,
+    img_size: int,
+    search: str = "linear",
+    tolerance: float = 1.0,
+    max_evaluations: int = 16,
+    coarse_scale: int = 1,
+):
+    """
+    Split the target into layers of increasing blur, filling each canvas and
+    yielding its trans_img.
+
+    See segment_into_layer_map for the arguments.
+    """
+    for i, layer_map in enumerate(
+        segment_into_layer_map(
+            target_img,
+            num_images,
+            img_size,
+            search=search,
+            tolerance=tolerance,
+            max_evaluations=max_evaluations,
+            coarse_scale=coarse_scale,
+        )
+    ):
+        # Fill canvas with masked content
+        mask = layer_map.layer_mask(i)
+        canvases[i][mask, :3] = target_img[mask]
+        canvases[i][mask, 3] = 1.0
+        save_image(canvases[i], f"canvas_{i}.png", image_type=SaveType.DEBUG)
+
+        # Create and yield trans_image for this layer
+        # Ctrl click the box of the mask layer (selects all), click the fill layer, Layer -> Raster Mask -> Hide selection
+        trans_img = layer_map.trans_image(i)
+        save_image(trans_img, f"trans_mask_{i}.png", image_type=SaveType.DEBUG)
+
+        yield trans_img
+
+
+def segment_into_layer_map(
+    target_img,
+    num_images: int,
+    img_size: int,
+    search: str = "linear",
+    tolerance: float = 1.0,
+    max_evaluations: int = 16,
+    coarse_scale: int = 1,
+):
+    """
+    Split the target into layers of increasing blur, recording which layer owns
+    each pixel in a LayerMap.
+
+    Yields the same LayerMap after each layer is assigned, so layers 0..i are
+    final at the i-th yield.
+
+    Args:
+        search: "linear" steps sigma until the layer covers mask_threshold,
+            or sigma reaches img_size.
+            "bisection" brackets the smallest such sigma and narrows it with
+            secant/bisection steps, using at most max_evaluations blurs.
+        tolerance: Bracket width (in sigma) at which bisection stops
+        max_evaluations: Full-resolution evaluation budget per layer for bisection
+        coarse_scale: If > 1, bisection first brackets sigma on an image
+            downsampled by this factor and only refines at full resolution
+    """
+    if search not in ("linear", "bisection"):
+        raise ValueError(f"Unknown search mode: {search}")
+    if num_images >= UNCLAIMED:
+        raise ValueError(f"At most {UNCLAIMED - 1} layers are supported")
+
+    layer_map = LayerMap(
+        target=target_img,
+        owner=np.full((img_size, img_size), UNCLAIMED, dtype=np.uint8),
+        num_images=num_images,
+    )
+
+    # Pixels owned by the layers before the current one, updated in place
+    claimed = np.zeros((img_size, img_size), dtype=bool)
+    unclaimed = np.empty_like(claimed)
 
     sigma = 0
     sigma_increment = 1
+    # Past this blur the image barely changes, so searches stop here even if
+    # the layer never reaches mask_threshold
+    sigma_max = img_size
     diff_threshold = 0.05
     mask_threshold = 100.0 / (num_images + 2)
     print(f"Mask threshold: {mask_threshold:.2f}%")
     prev_img = target_img
+    scale_space = GaussianScaleSpace(target_img)
+    if search == "bisection" and coarse_scale > 1:
+        coarse_size = max(1, img_size // coarse_scale)
+        coarse_target = cv2.resize(
+            target_img, (coarse_size, coarse_size), interpolation=cv2.INTER_AREA
+        )
+        coarse_scale_space = GaussianScaleSpace(coarse_target)
+        coarse_prev_img = coarse_target
 
     for i in range(num_images):
+        np.logical_not(claimed, out=unclaimed)
         if i < num_images - 1:
             # Generate mask for this layer
-            cum_mask = ~np.any(np.array(masks[:i]), axis=0)
-            mask_pct = 0
-            prev_mask_pct = 0
-            while mask_pct < mask_threshold:
-                filtered_img = low_pass_filter(target_img, sigma=sigma)
-                diff = filtered_img - prev_img
-                mask = np.max(np.abs(diff), axis=2) >= diff_threshold
-                mask &= cum_mask
+            cum_mask = unclaimed
+            if search == "linear":
+                mask_pct = 0
+                prev_mask_pct = 0
+                evaluations = 0
+                while mask_pct < mask_threshold:
+                    filtered_img, mask = measure_mask(
+                        scale_space, sigma, prev_img, cum_mask, diff_threshold
+                    )
+                    evaluations += 1
+                    mask_pct = calculate_pct_masked(mask, img_size)
+                    print(f"Image {i} sigma {sigma} mask percentage: {mask_pct:.2f}%")
+                    if sigma >= sigma_max:
+                        break
+                    delta = mask_pct - prev_mask_pct
+                    if delta < 1:
+                        sigma_increment += 1
+                    elif delta > 2:
+                        sigma_increment = max(1, sigma_increment - 1)
+                    sigma = min(sigma + sigma_increment, sigma_max)
+                    prev_mask_pct = mask_pct
+                print(f"Image {i} used {evaluations} evaluations")
+            else:
+                lo, hi = sigma, sigma + 1
+                coarse_evaluations = 0
+                if coarse_scale > 1:
+                    coarse_cum_mask = cv2.resize(
+                        cum_mask.view(np.uint8),
+                        (coarse_size, coarse_size),
+                        interpolation=cv2.INTER_NEAREST,
+                    ).astype(bool)
+                    coarse_sigma, _, _, lo, coarse_evaluations = search_sigma(
+                        lambda s: measure_mask(
+                            coarse_scale_space,
+                            s / coarse_scale,
+                            coarse_prev_img,
+                            coarse_cum_mask,
+                            diff_threshold,
+                        ),
+                        mask_threshold,
+                        lo=lo,
+                        hi=hi,
+                        sigma_max=sigma_max,
+                        tolerance=tolerance * coarse_scale,
+                        max_evaluations=max_evaluations,
+                    )
+                    hi = max(coarse_sigma, lo + tolerance)
+                sigma, filtered_img, mask, _, evaluations = search_sigma(
+                    lambda s: measure_mask(
+                        scale_space, s, prev_img, cum_mask, diff_threshold
+                    ),
+                    mask_threshold,
+                    lo=lo,
+                    hi=hi,
+                    sigma_max=sigma_max,
+                    tolerance=tolerance,
+                    max_evaluations=max_evaluations,
+                )
+                if coarse_scale > 1:
+                    coarse_prev_img = coarse_scale_space.blur(sigma / coarse_scale)
                 mask_pct = calculate_pct_masked(mask, img_size)
-                print(f"Image {i} sigma {sigma} mask percentage: {mask_pct:.2f}%")
-                delta = mask_pct - prev_mask_pct
-                if delta < 1:
-                    sigma_increment += 1
-                elif delta > 2:
-                    sigma_increment = max(1, sigma_increment - 1)
-                sigma += sigma_increment
-                prev_mask_pct = mask_pct
-            masks[i] = mask
+                print(
+                    f"Image {i} sigma {sigma:.2f} mask percentage: {mask_pct:.2f}% "
+                    f"({evaluations} evaluations, {coarse_evaluations} coarse)"
+                )
             prev_img = filtered_img
             save_image(filtered_img, f"filtered_{i}.png", image_type=SaveType.DEBUG)
         else:
             # Last layer gets remaining pixels
-            masks[-1] = ~np.any(np.array(masks[:-1]), axis=0)
+            mask = unclaimed
 
-        # Fill canvas with masked content
-        canvases[i][masks[i], :3] = target_img[masks[i]]
-        canvases[i][masks[i], 3] = 1.0
-        save_image(canvases[i], f"canvas_{i}.png", image_type=SaveType.DEBUG)
+        layer_map.owner[mask] = i
+        np.logical_or(claimed, mask, out=claimed)
 
-        # Create and yield trans_image for this layer
-        # Ctrl click the box of the mask layer (selects all), click the fill layer, Layer -> Raster Mask -> Hide selection
-        if i == 0:
-            # First layer - no mask (all transparent)
-            trans_img = np.zeros((img_size, img_size, 4), dtype=np.float32)
+        yield layer_map
+
+
+def measure_mask(
+    scale_space: GaussianScaleSpace,
+    sigma: float,
+    prev_img: np.ndarray,
+    cum_mask: np.ndarray,
+    diff_threshold: float,
+) -> tuple[np.ndarray, np.ndarray]:
+    """
+    Blur to sigma and mask the unclaimed pixels that changed since prev_img.
+    """
+    filtered_img = scale_space.blur(sigma)
+    diff = filtered_img - prev_img
+    mask = np.max(np.abs(diff), axis=2) >= diff_threshold
+    mask &= cum_mask
+    return filtered_img, mask
+
+
+def search_sigma(
+    measure,
+    target_pct: float,
+    lo: float,
+    hi: float,
+    sigma_max: float,
+    tolerance: float = 1.0,
+    max_evaluations: int = 16,
+):
+    """
+    Find the smallest sigma whose mask covers at least target_pct.
+
+    The bracket starts at (lo, hi], where lo is assumed to be below the target.
+    hi is expanded geometrically until it reaches the target, then the bracket
+    is narrowed with secant steps (falling back to bisection) until it is
+    narrower than tolerance or the evaluation budget is spent.
+
+    Args:
+        measure: Function of sigma returning (filtered_img, mask)
+
+    Returns:
+        (sigma, filtered_img, mask, lo, evaluations) where sigma is the upper
+        end of the final bracket and lo the lower end
+    """
+    evaluations = 0
+    lo_pct = 0.0
+    hi = min(hi, sigma_max)
+
+    # Expand upwards until the bracket contains the target
+    while True:
+        filtered_img, mask = measure(hi)
+        evaluations += 1
+        hi_pct = np.count_nonzero(mask) / mask.size * 100
+        if hi_pct >= target_pct or hi >= sigma_max or evaluations >= max_evaluations:
+            break
+        lo, lo_pct = hi, hi_pct
+        hi = min(sigma_max, max(2 * hi, hi + 1))
+    best = (hi, filtered_img, mask)
+    if hi_pct < target_pct:
+        return hi, filtered_img, mask, lo, evaluations
+
+    # Narrow the bracket
+    while hi - lo > tolerance and evaluations < max_evaluations:
+        width = hi - lo
+        guess = lo + (target_pct - lo_pct) / (hi_pct - lo_pct) * width
+        if not lo + 0.1 * width <= guess <= hi - 0.1 * width:
+            guess = lo + width / 2
+        filtered_img, mask = measure(guess)
+        evaluations += 1
+        pct = np.count_nonzero(mask) / mask.size * 100
+        if pct >= target_pct:
+            hi, hi_pct = guess, pct
+            best = (hi, filtered_img, mask)
         else:
-            # Cumulative mask of all previous layers
-            cum_mask = np.any(np.array(masks[:i]), axis=0)
-            trans_img = np.ones((img_size, img_size, 4), dtype=np.float32)
-            trans_img[~cum_mask, 3] = 0
-        save_image(trans_img, f"trans_mask_{i}.png", image_type=SaveType.DEBUG)
+            lo, lo_pct = guess, pct
 
-        yield trans_img
+    sigma, filtered_img, mask = best
+    return sigma, filtered_img, mask, lo, evaluations
 
 
 def calculate_pct_transparent(canvas, img_size: int):
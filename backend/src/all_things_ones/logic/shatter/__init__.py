@@ -1,8 +1,19 @@
 from .apply_shatter_pattern import apply_shatter_pattern
 from .construct_image_from_pieces import construct_image_from_pieces
-from .create_shatter_pattern import create_shatter_pattern
+from .create_shatter_pattern import (
+    create_shatter_pattern,
+    create_shatter_points,
+    rasterize_shatter_points,
+)
 from .create_shatter_pattern_with_cache import create_shatter_pattern_with_cache
-from .model import ShatterPattern
+from .distribute_pieces import (
+    DISTRIBUTION_STRATEGIES,
+    distribute_pieces,
+    find_piece_adjacency,
+)
+from .model import ShatterPattern, ShatterPieceIndex
+from .render_shatter_layers import render_shatter_layers
+from .resample_shatter_pattern import resample_shatter_pattern
 from .shatter_image import shatter_image
 from .shatter_image_with_cache import shatter_image_with_cache
 
@@ -10,8 +21,16 @@ __all__ = [
     "apply_shatter_pattern",
     "construct_image_from_pieces",
     "create_shatter_pattern",
+    "create_shatter_points",
     "create_shatter_pattern_with_cache",
+    "DISTRIBUTION_STRATEGIES",
+    "distribute_pieces",
+    "find_piece_adjacency",
     "ShatterPattern",
+    "ShatterPieceIndex",
+    "rasterize_shatter_points",
+    "render_shatter_layers",
+    "resample_shatter_pattern",
     "shatter_image",
     "shatter_image_with_cache",
 ]
@@ -1,7 +1,6 @@
 from typing import List
 
 import numpy as np
-from scipy import ndimage
 
 from .model import BoundingBox, ShatterPattern, ShatterPiece
 
@@ -20,31 +19,22 @@ def apply_shatter_pattern(
             f"Pattern dimensions ({pattern.width}x{pattern.height}) don't match target ({width}x{height})"
         )
 
-    # Find unique pieces and their bounding boxes in one pass
-    unique_pieces = np.unique(pattern.region_map)
-
-    # Use scipy to find bounding boxes efficiently
-    slice_objects = ndimage.find_objects(
-        pattern.region_map, max_label=unique_pieces.max()
-    )
+    # Bounding boxes come from the pattern's index, so the full region map is
+    # not rescanned per call
+    index = pattern.index
+    bboxes = index.bboxes.tolist()
 
     all_pieces = []
 
-    for piece_idx in unique_pieces:
+    for piece_idx in np.flatnonzero(index.pixel_counts).tolist():
         if piece_idx == 0:  # Skip background
             continue
 
-        slice_obj = slice_objects[piece_idx - 1]  # find_objects is 1-indexed
-        if slice_obj is None:
-            continue
-
-        row_slice, col_slice = slice_obj
-        min_row, max_row = row_slice.start, row_slice.stop
-        min_col, max_col = col_slice.start, col_slice.stop
+        min_row, min_col, max_row, max_col = bboxes[piece_idx]
 
         # Extract regions
-        region_mask = pattern.region_map[row_slice, col_slice] == piece_idx
-        piece_target = target[row_slice, col_slice]
+        region_mask = pattern.region_map[min_row:max_row, min_col:max_col] == piece_idx
+        piece_target = target[min_row:max_row, min_col:max_col]
 
         # Create piece data efficiently
         piece_height, piece_width = region_mask.shape
@@ -52,7 +42,7 @@ def apply_shatter_pattern(
             (piece_height, piece_width, channels + 1), dtype=target.dtype
         )
         piece_data[:, :, :channels] = piece_target
-        piece_data[:, :, channels] = region_mask.astype(target.dtype)
+        piece_data[:, :, channels] = region_mask
 
         all_pieces.append(
             ShatterPiece(
@@ -1,42 +1,126 @@
 import hashlib
-import pickle
-from pathlib import Path
+from typing import Optional
 
-from .create_shatter_pattern import create_shatter_pattern
-from .model import ShatterPattern
+import numpy as np
+
+from all_things_ones.repository.cache import get_shatter_pattern_cache
+
+from .create_shatter_pattern import create_shatter_points, rasterize_shatter_points
+from .model import ShatterPattern, ShatterPieceIndex
+from .resample_shatter_pattern import resample_shatter_pattern
+
+# Bump when the points or rasterization change so stale patterns are not reused
+SHATTER_CACHE_VERSION = 3
 
 
 def create_shatter_pattern_with_cache(
-    width: int, height: int, num_pieces: int, seed: int
+    width: int,
+    height: int,
+    num_pieces: int,
+    seed: int,
+    method: str = "kdtree",
+    resolution_mode: str = "rasterize",
 ) -> ShatterPattern:
-    cache_key = _get_cache_key(width, height, num_pieces, seed)
-    pattern = _load_pattern_from_cache(cache_key)
-    if pattern is None:
-        pattern = create_shatter_pattern(width, height, num_pieces, seed)
-        _save_pattern_to_cache(pattern, cache_key)
-    return pattern
+    """
+    Get a shatter pattern at the given size, reusing cached work.
 
+    The impact points are cached once per (num_pieces, seed) and region maps
+    once per resolution, so a new size never regenerates the points.
+    resolution_mode decides how a size without a cached region map is built:
+        - "rasterize": compute the exact region map from the points.
+        - "nearest": resample the largest cached region map of the same
+          points with nearest-neighbour sampling, which is near instant.
+          Falls back to "rasterize" when nothing is cached yet.
+    """
+    if resolution_mode not in ("rasterize", "nearest"):
+        raise ValueError(f"Unknown resolution mode: {resolution_mode}")
 
-def _get_cache_key(width: int, height: int, num_pieces: int, seed: int) -> str:
-    key_string = f"{width}_{height}_{num_pieces}_{seed}"
-    return hashlib.md5(key_string.encode()).hexdigest()
+    points_key = _get_cache_key(num_pieces, seed)
+    raster_key = f"{points_key}_{width}x{height}"
+    cache = get_shatter_pattern_cache()
+
+    # An exact region map is always preferred, then an earlier resample
+    keys = [raster_key]
+    if resolution_mode == "nearest":
+        keys.append(f"{raster_key}_nearest")
+    for key in keys:
+        entry = cache.get(key)
+        if entry is not None:
+            return _pattern_from_arrays(*entry)
+
+    if resolution_mode == "nearest":
+        source = _find_largest_raster(points_key)
+        if source is not None:
+            pattern = resample_shatter_pattern(source, width, height)
+            return _store_pattern(f"{raster_key}_nearest", pattern)
+
+    points = _get_points(points_key, num_pieces, seed)
+    pattern = rasterize_shatter_points(points, width, height, method)
+    return _store_pattern(raster_key, pattern)
 
 
-def _get_cache_dir() -> Path:
-    cache_dir = Path.cwd() / ".cache"
-    cache_dir.mkdir(parents=True, exist_ok=True)
-    return cache_dir
+def _get_points(points_key: str, num_pieces: int, seed: int) -> np.ndarray:
+    # Stored rather than regenerated so seed=None patterns stay consistent
+    cache = get_shatter_pattern_cache()
+    entry = cache.get(points_key)
+    if entry is not None:
+        arrays, _ = entry
+        return np.asarray(arrays["points"])
+    points = create_shatter_points(num_pieces, seed)
+    cache.put(points_key, {"points": points}, {"num_pieces": num_pieces})
+    return points
 
 
-def _load_pattern_from_cache(cache_key: str):
-    cache_file = _get_cache_dir() / f"{cache_key}.pkl"
-    if cache_file.exists():
-        with open(cache_file, "rb") as f:
-            return pickle.load(f)
+def _find_largest_raster(points_key: str) -> Optional[ShatterPattern]:
+    cache = get_shatter_pattern_cache()
+    sizes = []
+    for key in cache.find_keys(f"{points_key}_"):
+        # Only exact rasterizations, resampling a resample loses more detail
+        size = key[len(points_key) + 1 :]
+        if "_" in size:
+            continue
+        width, height = (int(v) for v in size.split("x"))
+        sizes.append((width * height, key))
+    for _, key in sorted(sizes, reverse=True):
+        entry = cache.get(key)
+        if entry is not None:
+            return _pattern_from_arrays(*entry)
     return None
 
 
-def _save_pattern_to_cache(pattern, cache_key: str):
-    cache_file = _get_cache_dir() / f"{cache_key}.pkl"
-    with open(cache_file, "wb") as f:
-        pickle.dump(pattern, f)
+def _store_pattern(key: str, pattern: ShatterPattern) -> ShatterPattern:
+    # uint16 halves the size of the region map when the labels fit
+    region_map = pattern.region_map
+    if pattern.num_pieces <= np.iinfo(np.uint16).max:
+        region_map = region_map.astype(np.uint16)
+    # The index is small next to the region map, so it is stored with it
+    index = ShatterPieceIndex.from_region_map(region_map, pattern.num_pieces)
+    arrays = {"region_map": region_map, **index.to_arrays()}
+    metadata = {
+        "num_pieces": pattern.num_pieces,
+        "width": pattern.width,
+        "height": pattern.height,
+    }
+    get_shatter_pattern_cache().put(key, arrays, metadata)
+    return _pattern_from_arrays(arrays, metadata)
+
+
+def _pattern_from_arrays(
+    arrays: dict[str, np.ndarray], metadata: dict
+) -> ShatterPattern:
+    # Entries stored before bounding boxes were kept build their index lazily
+    known_index = None
+    if "bboxes" in arrays:
+        known_index = ShatterPieceIndex(arrays["bboxes"], arrays["pixel_counts"])
+    return ShatterPattern(
+        region_map=arrays["region_map"],
+        num_pieces=metadata["num_pieces"],
+        width=metadata["width"],
+        height=metadata["height"],
+        known_index=known_index,
+    )
+
+
+def _get_cache_key(num_pieces: int, seed: int) -> str:
+    key_string = f"{num_pieces}_{seed}_v{SHATTER_CACHE_VERSION}"
+    return hashlib.md5(key_string.encode()).hexdigest()
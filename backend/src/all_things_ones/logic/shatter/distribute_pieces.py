@@ -0,0 +1,130 @@
+import heapq
+from typing import Callable
+
+import numpy as np
+
+from .model import ShatterPattern
+
+
+def distribute_pieces(
+    pattern: ShatterPattern,
+    num_images: int,
+    strategy: str = "round_robin",
+    seed: int = None,
+) -> np.ndarray:
+    """
+    Decide which output image each piece of a pattern goes to.
+
+    Empty pieces and piece 0 (background) are left out. Strategies:
+        - "round_robin": piece i goes to image i % num_images.
+        - "area_balanced": largest pieces first, each to the image with the
+          least area so far, so every image covers about the same pixels.
+        - "graph_colouring": like area_balanced, but a piece avoids images
+          that already hold one of its neighbours when it can.
+        - "random": round robin over a seeded shuffle of the pieces.
+
+    Returns:
+        int16 array of length num_pieces with the image of each piece, -1 for
+        pieces left out
+    """
+    if strategy not in DISTRIBUTION_STRATEGIES:
+        raise ValueError(f"Unknown distribution strategy: {strategy}")
+
+    piece_ids = np.flatnonzero(pattern.pixel_counts)
+    piece_ids = piece_ids[piece_ids != 0]
+
+    piece_to_image = np.full(pattern.num_pieces, -1, dtype=np.int16)
+    piece_to_image[piece_ids] = DISTRIBUTION_STRATEGIES[strategy](
+        pattern, piece_ids, num_images, seed
+    )
+    return piece_to_image
+
+
+def find_piece_adjacency(region_map: np.ndarray) -> np.ndarray:
+    """
+    Find every pair of pieces that share an edge in the region map.
+
+    Returns:
+        Array of shape (num_pairs, 2) with unique (lower, higher) piece ids
+    """
+    horizontal = region_map[:, :-1] != region_map[:, 1:]
+    vertical = region_map[:-1, :] != region_map[1:, :]
+    first = np.concatenate(
+        [region_map[:, :-1][horizontal], region_map[:-1, :][vertical]]
+    )
+    second = np.concatenate(
+        [region_map[:, 1:][horizontal], region_map[1:, :][vertical]]
+    )
+
+    # Encode each pair as one integer so np.unique can deduplicate it
+    first, second = first.astype(np.int64), second.astype(np.int64)
+    lower, higher = np.minimum(first, second), np.maximum(first, second)
+    stride = int(region_map.max()) + 1
+    pair_keys = np.unique(lower * stride + higher)
+    return np.column_stack(np.divmod(pair_keys, stride))
+
+
+def _round_robin(
+    pattern: ShatterPattern, piece_ids: np.ndarray, num_images: int, seed: int
+) -> np.ndarray:
+    return np.arange(len(piece_ids)) % num_images
+
+
+def _random(
+    pattern: ShatterPattern, piece_ids: np.ndarray, num_images: int, seed: int
+) -> np.ndarray:
+    rng = np.random.default_rng(seed)
+    return rng.permutation(len(piece_ids)) % num_images
+
+
+def _area_balanced(
+    pattern: ShatterPattern, piece_ids: np.ndarray, num_images: int, seed: int
+) -> np.ndarray:
+    areas = pattern.pixel_counts[piece_ids]
+    images = np.empty(len(piece_ids), dtype=np.int64)
+
+    # Heap of (area so far, image), so the emptiest image is always on top
+    image_areas = [(0, image_idx) for image_idx in range(num_images)]
+    for i in np.argsort(-areas, kind="stable").tolist():
+        area, image_idx = heapq.heappop(image_areas)
+        images[i] = image_idx
+        heapq.heappush(image_areas, (area + int(areas[i]), image_idx))
+    return images
+
+
+def _graph_colouring(
+    pattern: ShatterPattern, piece_ids: np.ndarray, num_images: int, seed: int
+) -> np.ndarray:
+    areas = pattern.pixel_counts[piece_ids]
+    position = np.full(pattern.num_pieces, -1, dtype=np.int64)
+    position[piece_ids] = np.arange(len(piece_ids))
+
+    # Neighbour lists between distributed pieces, as positions into piece_ids
+    pairs = position[find_piece_adjacency(pattern.region_map)]
+    pairs = pairs[(pairs >= 0).all(axis=1)]
+    neighbours = [[] for _ in piece_ids]
+    for a, b in pairs.tolist():
+        neighbours[a].append(b)
+        neighbours[b].append(a)
+
+    images = np.full(len(piece_ids), -1, dtype=np.int64)
+    image_areas = np.zeros(num_images, dtype=np.int64)
+    for i in np.argsort(-areas, kind="stable").tolist():
+        # Fewest neighbours already on the image first, then least area
+        conflicts = np.zeros(num_images, dtype=np.int64)
+        neighbour_images = images[neighbours[i]]
+        np.add.at(conflicts, neighbour_images[neighbour_images >= 0], 1)
+        image_idx = int(np.lexsort((image_areas, conflicts))[0])
+        images[i] = image_idx
+        image_areas[image_idx] += areas[i]
+    return images
+
+
+DISTRIBUTION_STRATEGIES: dict[
+    str, Callable[[ShatterPattern, np.ndarray, int, int], np.ndarray]
+] = {
+    "round_robin": _round_robin,
+    "area_balanced": _area_balanced,
+    "graph_colouring": _graph_colouring,
+    "random": _random,
+}
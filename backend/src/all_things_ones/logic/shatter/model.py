@@ -1,6 +1,38 @@
-from dataclasses import dataclass
+from dataclasses import dataclass, field
+from functools import cached_property
+from typing import Optional
 
 import numpy as np
+from scipy import ndimage
+
+
+@dataclass(frozen=True)
+class ShatterPieceIndex:
+    # Rows of (min_row, min_col, max_row, max_col) per piece, max exclusive
+    bboxes: np.ndarray
+    # Number of pixels in each piece
+    pixel_counts: np.ndarray
+
+    @classmethod
+    def from_region_map(
+        cls, region_map: np.ndarray, num_pieces: int
+    ) -> "ShatterPieceIndex":
+        pixel_counts = np.bincount(region_map.ravel(), minlength=num_pieces)
+
+        # Pieces can be empty when their point fell outside the image
+        bboxes = np.zeros((num_pieces, 4), dtype=np.int32)
+        # find_objects treats label 0 as background, so piece 0 is found apart
+        slices = [_label_slices(region_map == 0)]
+        slices += ndimage.find_objects(region_map, max_label=num_pieces - 1)
+        for piece_id, piece_slices in enumerate(slices):
+            if piece_slices is not None:
+                rows, cols = piece_slices
+                bboxes[piece_id] = rows.start, cols.start, rows.stop, cols.stop
+
+        return cls(bboxes, pixel_counts)
+
+    def to_arrays(self) -> dict[str, np.ndarray]:
+        return {"bboxes": self.bboxes, "pixel_counts": self.pixel_counts}
 
 
 @dataclass(frozen=True)
@@ -10,6 +42,23 @@ class ShatterPattern:
     num_pieces: int
     width: int
     height: int
+    # Index stored alongside a cached pattern
+    known_index: Optional[ShatterPieceIndex] = field(
+        default=None, repr=False, compare=False
+    )
+
+    @cached_property
+    def index(self) -> ShatterPieceIndex:
+        if self.known_index is not None:
+            return self.known_index
+        return ShatterPieceIndex.from_region_map(self.region_map, self.num_pieces)
+
+    @cached_property
+    def pixel_counts(self) -> np.ndarray:
+        # Counting alone is cheaper than finding every bounding box
+        if self.known_index is not None or "index" in self.__dict__:
+            return self.index.pixel_counts
+        return np.bincount(self.region_map.ravel(), minlength=self.num_pieces)
 
 
 @dataclass(frozen=True)
@@ -25,3 +74,11 @@ class ShatterPiece:
     data: np.ndarray
     bbox: BoundingBox
     piece_id: int
+
+
+def _label_slices(mask: np.ndarray) -> Optional[tuple[slice, slice]]:
+    rows = np.flatnonzero(mask.any(axis=1))
+    if rows.size == 0:
+        return None
+    cols = np.flatnonzero(mask.any(axis=0))
+    return slice(rows[0], rows[-1] + 1), slice(cols[0], cols[-1] + 1)
@@ -0,0 +1,53 @@
+import numpy as np
+
+from .model import ShatterPattern
+
+
+def render_shatter_layers(
+    target: np.ndarray,
+    pattern: ShatterPattern,
+    piece_to_image: np.ndarray,
+    num_images: int,
+    background_color: float = 0.6,
+) -> list[np.ndarray]:
+    """
+    Render every composite straight from the region map, without piece crops.
+
+    Args:
+        target: Image to shatter, shape (height, width, channels)
+        pattern: Shatter pattern matching the target's dimensions
+        piece_to_image: Output image of each piece, -1 for pieces left out
+        num_images: Number of output images
+        background_color: Value of pixels not covered by an image's pieces
+
+    Returns:
+        One float32 composite per output image that received any pieces
+    """
+    height, width, channels = target.shape
+
+    if pattern.width != width or pattern.height != height:
+        raise ValueError(
+            f"Pattern dimensions ({pattern.width}x{pattern.height}) don't match target ({width}x{height})"
+        )
+
+    # Output image of every pixel, looked up once for all composites
+    image_map = piece_to_image.astype(np.int16).take(pattern.region_map)
+    used_images = set(piece_to_image[piece_to_image >= 0].tolist())
+
+    composite_images = []
+    for image_idx in range(num_images):
+        if image_idx not in used_images:
+            continue
+
+        composite = np.full(
+            (height, width, channels), background_color, dtype=np.float32
+        )
+        np.copyto(
+            composite,
+            target,
+            casting="unsafe",
+            where=(image_map == image_idx)[:, :, None],
+        )
+        composite_images.append(composite)
+
+    return composite_images
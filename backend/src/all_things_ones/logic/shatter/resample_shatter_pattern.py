@@ -0,0 +1,19 @@
+import numpy as np
+
+from .model import ShatterPattern
+
+
+def resample_shatter_pattern(
+    pattern: ShatterPattern, width: int, height: int
+) -> ShatterPattern:
+    """
+    Resize a pattern's region map with nearest-neighbour sampling.
+
+    Much cheaper than rasterizing the points again, but piece edges are only
+    as precise as the source resolution and slivers may disappear.
+    """
+    # Sample the source pixel under each target pixel's centre
+    rows = ((np.arange(height) + 0.5) * pattern.height / height).astype(np.intp)
+    cols = ((np.arange(width) + 0.5) * pattern.width / width).astype(np.intp)
+    region_map = pattern.region_map[rows[:, None], cols[None, :]]
+    return ShatterPattern(region_map, pattern.num_pieces, width, height)
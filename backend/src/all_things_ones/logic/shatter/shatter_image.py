@@ -1,9 +1,9 @@
 import numpy as np
 
-from .apply_shatter_pattern import apply_shatter_pattern
-from .construct_image_from_pieces import construct_image_from_pieces
 from .create_shatter_pattern import create_shatter_pattern
+from .distribute_pieces import distribute_pieces
 from .model import ShatterPattern
+from .render_shatter_layers import render_shatter_layers
 
 
 def shatter_image(
@@ -13,9 +13,13 @@ def shatter_image(
     seed: int = None,
     background_color: float = 0.6,
     pattern: ShatterPattern = None,
+    distribution: str = "round_robin",
 ) -> list[np.ndarray]:
     """
     Split image into irregular pieces like a shattered windshield, then distribute across multiple images.
+
+    distribution is the strategy deciding which image each piece goes to,
+    see distribute_pieces.
     """
     height, width, channels = target.shape
 
@@ -23,25 +27,8 @@ def shatter_image(
     if pattern is None:
         pattern = create_shatter_pattern(width, height, num_pieces, seed)
 
-    pieces = apply_shatter_pattern(target, pattern)
-
-    # Distribute pieces across images
-    distributed_images = [[] for _ in range(num_images)]
-
-    # Strategy: distribute pieces as evenly as possible
-    for i, piece in enumerate(pieces):
-        target_image = i % num_images
-        distributed_images[target_image].append(piece)
-
-    # Create composite images
-    composite_images = []
-    for pieces_list in distributed_images:
-        if not pieces_list:
-            continue
-
-        composite = construct_image_from_pieces(
-            pieces_list, (height, width, channels), background_color
-        )
-        composite_images.append(composite)
+    piece_to_image = distribute_pieces(pattern, num_images, distribution, seed)
 
-    return composite_images
+    return render_shatter_layers(
+        target, pattern, piece_to_image, num_images, background_color
+    )
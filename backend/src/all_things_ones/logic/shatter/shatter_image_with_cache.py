@@ -10,9 +10,13 @@ def shatter_image_with_cache(
     num_images: int,
     seed: int,
     background_color: float,
+    distribution: str = "round_robin",
+    resolution_mode: str = "rasterize",
 ) -> list[np.ndarray]:
     height, width = target.shape[:2]
-    pattern = create_shatter_pattern_with_cache(width, height, num_pieces, seed)
+    pattern = create_shatter_pattern_with_cache(
+        width, height, num_pieces, seed, resolution_mode=resolution_mode
+    )
     return shatter_image(
         target=target,
         num_pieces=num_pieces,
@@ -20,4 +24,5 @@ def shatter_image_with_cache(
         seed=seed,
         background_color=background_color,
         pattern=pattern,
+        distribution=distribution,
     )
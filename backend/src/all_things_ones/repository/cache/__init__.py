@@ -0,0 +1,13 @@
+from .layer_store import LayerStore, get_layer_store
+from .result_cache import ResultCache, get_result_cache, get_result_cache_key
+from .shatter_pattern_cache import ShatterPatternCache, get_shatter_pattern_cache
+
+__all__ = [
+    "LayerStore",
+    "get_layer_store",
+    "ResultCache",
+    "get_result_cache",
+    "get_result_cache_key",
+    "ShatterPatternCache",
+    "get_shatter_pattern_cache",
+]
@@ -0,0 +1,60 @@
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Optional
+
+from .lru_tiers import evict_entry_dirs
+
+LAYER_STORE_DIR = os.environ.get(
+    "LAYER_STORE_DIR", str(Path.cwd() / ".cache" / "layers")
+)
+LAYER_STORE_DISK_BYTES = int(os.environ.get("LAYER_STORE_DISK_MB", "1024")) * 2**20
+
+
+class LayerStore:
+    """
+    Disk store of encoded layers per job, so they can be served over HTTP.
+
+    Shared between the worker processes that write layers and the API process
+    that serves them. Files are written atomically and never change once
+    written; whole jobs are trimmed to `disk_bytes` by least recent use when a
+    new job is created.
+    """
+
+    def __init__(
+        self, root: str = LAYER_STORE_DIR, disk_bytes: int = LAYER_STORE_DISK_BYTES
+    ):
+        self.root = Path(root)
+        self.disk_bytes = disk_bytes
+
+    def create_job(self) -> str:
+        evict_entry_dirs(self.root, self.disk_bytes)
+        return uuid.uuid4().hex
+
+    def exists(self, job_id: str, name: str) -> bool:
+        return (self.root / job_id / name).is_file()
+
+    def get(self, job_id: str, name: str) -> Optional[bytes]:
+        try:
+            return (self.root / job_id / name).read_bytes()
+        except FileNotFoundError:
+            return None
+
+    def put(self, job_id: str, name: str, data: bytes) -> None:
+        job_dir = self.root / job_id
+        job_dir.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=job_dir, prefix=".tmp_")
+        with os.fdopen(fd, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, job_dir / name)
+
+
+_layer_store: Optional[LayerStore] = None
+
+
+def get_layer_store() -> LayerStore:
+    global _layer_store
+    if _layer_store is None:
+        _layer_store = LayerStore()
+    return _layer_store
@@ -0,0 +1,95 @@
+import os
+import shutil
+import tempfile
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Optional
+
+
+class MemoryLRU:
+    """
+    Thread-safe LRU of values in memory, bounded by their total size in bytes.
+
+    Values larger than the whole budget are not kept at all.
+    """
+
+    def __init__(self, max_bytes: int, sizeof: Callable[[Any], int]):
+        self.max_bytes = max_bytes
+        self._sizeof = sizeof
+        self._entries: OrderedDict[str, Any] = OrderedDict()
+        self._used = 0
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key: str, value: Any) -> None:
+        size = self._sizeof(value)
+        if size > self.max_bytes:
+            return
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                return
+            self._entries[key] = value
+            self._used += size
+            while self._used > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._used -= self._sizeof(evicted)
+
+    def keys(self) -> list[str]:
+        with self._lock:
+            return list(self._entries)
+
+
+def write_entry_dir(root: Path, key: str, write: Callable[[Path], None]) -> None:
+    """
+    Atomically create the entry directory root / key, unless it exists.
+
+    write fills a hidden temporary directory, which is then renamed into place,
+    so other processes never see a partial entry.
+    """
+    entry_dir = root / key
+    if entry_dir.exists():
+        return
+    root.mkdir(parents=True, exist_ok=True)
+    tmp_dir = Path(tempfile.mkdtemp(dir=root, prefix=".tmp_"))
+    write(tmp_dir)
+    try:
+        os.replace(tmp_dir, entry_dir)
+    except OSError:
+        # Another process stored the same entry first
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+
+def evict_entry_dirs(root: Path, max_bytes: int) -> None:
+    """
+    Remove the least recently used entry directories under root until the rest
+    fit in max_bytes.
+
+    Recency is each directory's mtime, so readers should touch an entry when
+    they use it. Hidden directories are entries still being written.
+    """
+    if not root.is_dir():
+        return
+    entries = []
+    total = 0
+    for entry_dir in root.iterdir():
+        if entry_dir.name.startswith(".") or not entry_dir.is_dir():
+            continue
+        try:
+            size = sum(f.stat().st_size for f in entry_dir.iterdir())
+            entries.append((entry_dir.stat().st_mtime, size, entry_dir))
+        except FileNotFoundError:
+            continue
+        total += size
+    for _, size, entry_dir in sorted(entries):
+        if total <= max_bytes:
+            break
+        shutil.rmtree(entry_dir, ignore_errors=True)
+        total -= size
@@ -0,0 +1,86 @@
+import hashlib
+import os
+from pathlib import Path
+from typing import Optional
+
+from .lru_tiers import MemoryLRU, evict_entry_dirs, write_entry_dir
+
+# Bump when the pipeline output changes so stale results are not replayed
+RESULT_CACHE_VERSION = 5
+RESULT_CACHE_DIR = os.environ.get(
+    "RESULT_CACHE_DIR", str(Path.cwd() / ".cache" / "results")
+)
+RESULT_CACHE_MEMORY_BYTES = int(os.environ.get("RESULT_CACHE_MEMORY_MB", "256")) * 2**20
+RESULT_CACHE_DISK_BYTES = int(os.environ.get("RESULT_CACHE_DISK_MB", "2048")) * 2**20
+
+
+def get_result_cache_key(target_bytes: bytes, num_images: int, img_size: int) -> str:
+    hasher = hashlib.sha256(target_bytes)
+    hasher.update(f"_{num_images}_{img_size}_v{RESULT_CACHE_VERSION}".encode())
+    return hasher.hexdigest()
+
+
+class ResultCache:
+    """
+    Two-tier LRU cache of encoded pipeline layers, keyed by content hash.
+
+    The memory tier is per process. The disk tier is shared between processes,
+    written atomically, and trimmed to `disk_bytes` by least recent use.
+    """
+
+    def __init__(
+        self,
+        root: str = RESULT_CACHE_DIR,
+        memory_bytes: int = RESULT_CACHE_MEMORY_BYTES,
+        disk_bytes: int = RESULT_CACHE_DISK_BYTES,
+    ):
+        self.root = Path(root)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = MemoryLRU(
+            memory_bytes, lambda layers: sum(len(layer) for layer in layers)
+        )
+
+    def get(self, key: str) -> Optional[list[bytes]]:
+        layers = self._memory.get(key)
+        if layers is not None:
+            return layers
+        layers = self._load_from_disk(key)
+        if layers is not None:
+            self._memory.put(key, layers)
+        return layers
+
+    def put(self, key: str, layers: list[bytes]) -> None:
+        self._memory.put(key, layers)
+        self._save_to_disk(key, layers)
+        evict_entry_dirs(self.root, self.disk_bytes)
+
+    def _load_from_disk(self, key: str) -> Optional[list[bytes]]:
+        entry_dir = self.root / key
+        if not entry_dir.is_dir():
+            return None
+        try:
+            layer_files = sorted(entry_dir.glob("layer_*.png"))
+            layers = [layer_file.read_bytes() for layer_file in layer_files]
+            os.utime(entry_dir)
+        except FileNotFoundError:
+            # Evicted by another process while reading
+            return None
+        return layers or None
+
+    def _save_to_disk(self, key: str, layers: list[bytes]) -> None:
+        def write(entry_dir: Path) -> None:
+            for i, layer in enumerate(layers):
+                (entry_dir / f"layer_{i:03d}.png").write_bytes(layer)
+
+        write_entry_dir(self.root, key, write)
+
+
+_result_cache: Optional[ResultCache] = None
+
+
+def get_result_cache() -> ResultCache:
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = ResultCache()
+    return _result_cache
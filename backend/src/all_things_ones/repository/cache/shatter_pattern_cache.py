@@ -0,0 +1,115 @@
+import json
+import os
+from pathlib import Path
+from typing import Optional
+
+import numpy as np
+
+from .lru_tiers import MemoryLRU, evict_entry_dirs, write_entry_dir
+
+SHATTER_CACHE_DIR = os.environ.get(
+    "SHATTER_CACHE_DIR", str(Path.cwd() / ".cache" / "shatter")
+)
+SHATTER_CACHE_MEMORY_BYTES = (
+    int(os.environ.get("SHATTER_CACHE_MEMORY_MB", "128")) * 2**20
+)
+SHATTER_CACHE_DISK_BYTES = int(os.environ.get("SHATTER_CACHE_DISK_MB", "1024")) * 2**20
+
+
+class ShatterPatternCache:
+    """
+    Two-tier LRU cache of shatter patterns, stored as named arrays plus metadata.
+
+    Each array is stored on disk as a raw .npy file with a JSON sidecar for the
+    metadata, and loaded memory-mapped read-only so only the pages that are
+    touched are read. The memory tier keeps recently used patterns per
+    process; the disk tier is trimmed to `disk_bytes` by least recent use.
+    """
+
+    def __init__(
+        self,
+        root: str = SHATTER_CACHE_DIR,
+        memory_bytes: int = SHATTER_CACHE_MEMORY_BYTES,
+        disk_bytes: int = SHATTER_CACHE_DISK_BYTES,
+    ):
+        self.root = Path(root)
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self._memory = MemoryLRU(memory_bytes, _entry_bytes)
+
+    def get(self, key: str) -> Optional[tuple[dict[str, np.ndarray], dict]]:
+        """
+        Look up an entry. Its arrays are read-only and shared with other callers.
+        """
+        entry = self._memory.get(key)
+        if entry is not None:
+            return entry
+        entry = self._load_from_disk(key)
+        if entry is not None:
+            self._memory.put(key, entry)
+        return entry
+
+    def put(self, key: str, arrays: dict[str, np.ndarray], metadata: dict) -> None:
+        """
+        Store copies of arrays, so the caller's arrays stay writable and later
+        changes to them do not reach the cache.
+        """
+        arrays = {name: array.copy() for name, array in arrays.items()}
+        for array in arrays.values():
+            array.flags.writeable = False
+        self._memory.put(key, (arrays, metadata))
+        self._save_to_disk(key, arrays, metadata)
+        evict_entry_dirs(self.root, self.disk_bytes)
+
+    def find_keys(self, prefix: str) -> list[str]:
+        """
+        List cached keys starting with prefix, from both tiers.
+        """
+        keys = {key for key in self._memory.keys() if key.startswith(prefix)}
+        if self.root.is_dir():
+            keys.update(
+                entry_dir.name
+                for entry_dir in self.root.glob(f"{prefix}*")
+                if entry_dir.is_dir()
+            )
+        return sorted(keys)
+
+    def _load_from_disk(self, key: str) -> Optional[tuple[dict[str, np.ndarray], dict]]:
+        entry_dir = self.root / key
+        if not entry_dir.is_dir():
+            return None
+        try:
+            metadata = json.loads((entry_dir / "metadata.json").read_text())
+            arrays = {
+                array_file.stem: np.load(array_file, mmap_mode="r")
+                for array_file in entry_dir.glob("*.npy")
+            }
+            os.utime(entry_dir)
+        except FileNotFoundError:
+            # Evicted by another process while reading
+            return None
+        return arrays, metadata
+
+    def _save_to_disk(
+        self, key: str, arrays: dict[str, np.ndarray], metadata: dict
+    ) -> None:
+        def write(entry_dir: Path) -> None:
+            for name, array in arrays.items():
+                np.save(entry_dir / f"{name}.npy", array)
+            (entry_dir / "metadata.json").write_text(json.dumps(metadata))
+
+        write_entry_dir(self.root, key, write)
+
+
+def _entry_bytes(entry: tuple[dict[str, np.ndarray], dict]) -> int:
+    return sum(array.nbytes for array in entry[0].values())
+
+
+_shatter_pattern_cache: Optional[ShatterPatternCache] = None
+
+
+def get_shatter_pattern_cache() -> ShatterPatternCache:
+    global _shatter_pattern_cache
+    if _shatter_pattern_cache is None:
+        _shatter_pattern_cache = ShatterPatternCache()
+    return _shatter_pattern_cache
@@ -1,6 +1,21 @@
 from .clear_files import clear_files
 from .load_image import load_image
 from .load_images import load_images
-from .save_image import SaveType, save_image
+from .save_image import (
+    SaveType,
+    current_debug_job,
+    debug_output,
+    flush_images,
+    save_image,
+)
 
-__all__ = ["clear_files", "load_image", "load_images", "save_image", "SaveType"]
+__all__ = [
+    "clear_files",
+    "current_debug_job",
+    "debug_output",
+    "flush_images",
+    "load_image",
+    "load_images",
+    "save_image",
+    "SaveType",
+]
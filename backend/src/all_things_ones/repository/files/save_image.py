@@ -1,8 +1,24 @@
+import atexit
+import os
+import queue
+import random
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
 from enum import Enum
+from typing import Iterator, Optional
 
 import cv2
 import numpy as np
 
+# "off" writes nothing, "output" only split and recombined results, "debug"
+# also the intermediate debug images
+SAVE_IMAGE_LEVEL = os.environ.get("SAVE_IMAGE_LEVEL", "debug")
+# Fraction of jobs that write debug images
+DEBUG_IMAGE_SAMPLE_RATE = float(os.environ.get("DEBUG_IMAGE_SAMPLE_RATE", "1.0"))
+# Images waiting for the writer before save_image blocks
+SAVE_IMAGE_QUEUE_SIZE = int(os.environ.get("SAVE_IMAGE_QUEUE_SIZE", "32"))
+
 
 class SaveType(Enum):
     DEBUG = 1
@@ -12,18 +28,142 @@ class SaveType(Enum):
     DEBUG3 = 5
 
 
+FOLDERS = {
+    SaveType.DEBUG: "debug",
+    SaveType.SPLIT: "split",
+    SaveType.RECOMBINED: "recombined",
+    SaveType.DEBUG2: "debug2",
+    SaveType.DEBUG3: "debug3",
+}
+DEBUG_TYPES = {SaveType.DEBUG, SaveType.DEBUG2, SaveType.DEBUG3}
+
+# (job_id, sampled) of the job running in this context, if any
+_debug_job: ContextVar[Optional[tuple[str, bool]]] = ContextVar(
+    "debug_job", default=None
+)
+# Own generator, so seeding the global one does not fix which jobs are sampled
+_sampler = random.Random()
+
+
 def save_image(image: np.ndarray, path: str, image_type: SaveType) -> None:
-    folder = (
-        "debug"
-        if image_type == SaveType.DEBUG
-        else "split"
-        if image_type == SaveType.SPLIT
-        else "recombined"
-        if image_type == SaveType.RECOMBINED
-        else "debug2"
-        if image_type == SaveType.DEBUG2
-        else "debug3"
-    )
-    path = f"data/output/{folder}/{path}"
-    image = (image * 255).astype(np.uint8)
-    cv2.imwrite(path, image)
+    """
+    Queue a float image in [0, 1] to be written under data/output.
+
+    Encoding and writing happen on a background thread. Debug images are
+    skipped unless SAVE_IMAGE_LEVEL is "debug" and the current job was
+    sampled, and go to a folder per job inside `debug_output`.
+    """
+    if not _should_save(image_type):
+        return
+
+    folder = FOLDERS[image_type]
+    job = _debug_job.get()
+    if job is not None and image_type in DEBUG_TYPES:
+        folder = f"{folder}/{job[0]}"
+
+    # Copied while quantizing, so the caller is free to modify the image
+    image_uint8 = np.empty(image.shape, dtype=np.uint8)
+    np.multiply(image, 255, out=image_uint8, casting="unsafe")
+    get_image_writer().write(f"data/output/{folder}/{path}", image_uint8)
+
+
+@contextmanager
+def debug_output(job_id: str, sampled: Optional[bool] = None) -> Iterator[None]:
+    """
+    Write debug images saved inside the block to a folder for this job.
+
+    Whether the job writes debug images at all is decided once here, by
+    DEBUG_IMAGE_SAMPLE_RATE, unless given. Pass `current_debug_job()` to
+    continue a job in another process.
+    """
+    if sampled is None:
+        sampled = _sampler.random() < DEBUG_IMAGE_SAMPLE_RATE
+    token = _debug_job.set((job_id, sampled))
+    try:
+        yield
+    finally:
+        _debug_job.reset(token)
+
+
+def current_debug_job() -> Optional[tuple[str, bool]]:
+    """
+    The (job_id, sampled) set by the enclosing `debug_output`, if any.
+    """
+    return _debug_job.get()
+
+
+def _should_save(image_type: SaveType) -> bool:
+    if image_type not in DEBUG_TYPES:
+        return SAVE_IMAGE_LEVEL in ("output", "debug")
+    if SAVE_IMAGE_LEVEL != "debug":
+        return False
+    job = _debug_job.get()
+    return job is None or job[1]
+
+
+class ImageWriter:
+    """
+    Background thread that encodes and writes queued images in order.
+
+    The queue is bounded, so a caller producing images faster than they can
+    be written is slowed down instead of holding them all in memory.
+    """
+
+    def __init__(self, max_queued: int = SAVE_IMAGE_QUEUE_SIZE):
+        self._queue: queue.Queue = queue.Queue(maxsize=max(1, max_queued))
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+
+    def write(self, path: str, image: np.ndarray) -> None:
+        self._start()
+        self._queue.put((path, image))
+
+    def flush(self) -> None:
+        """
+        Wait until every queued image is written.
+        """
+        self._queue.join()
+
+    def _start(self) -> None:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name="image-writer", daemon=True
+                )
+                self._thread.start()
+
+    def _run(self) -> None:
+        while True:
+            path, image = self._queue.get()
+            try:
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                if not cv2.imwrite(path, image):
+                    print(f"Failed to save image: {path}")
+            except Exception as e:
+                print(f"Failed to save image {path}: {e}")
+            finally:
+                self._queue.task_done()
+
+
+_image_writer: Optional[ImageWriter] = None
+_image_writer_lock = threading.Lock()
+
+
+def get_image_writer() -> ImageWriter:
+    global _image_writer
+    with _image_writer_lock:
+        if _image_writer is None:
+            _image_writer = ImageWriter()
+    return _image_writer
+
+
+def flush_images() -> None:
+    """
+    Wait until every image saved so far is on disk.
+    """
+    if _image_writer is not None:
+        _image_writer.flush()
+
+
+# Scripts exit right after saving, so write out what is still queued
+atexit.register(flush_images)
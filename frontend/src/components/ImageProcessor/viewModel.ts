@@ -107,7 +107,8 @@ export function useImageProcessorViewModel(): ImageProcessorViewModel {
             break;
 
           case "image":
-            const url = `data:image/png;base64,${data.image}`;
+            // Layers are downloaded separately, the event only carries the URL
+            const url = `http://localhost:8000${data.url}`;
             setResultImageUrls((prev) => ({
               ...prev,
               [data.index]: url,